@@ -1,12 +1,20 @@
 import argparse
+import base64
+import json
+import os
 import sys
 
 from openeeprom.chip import \
         microchip25lc320, \
-        at28c256
-from openeeprom.transport.serial import SerialTransport
-from openeeprom.transport.tcp import TcpTransport
+        at28c256, \
+        at24cxx, \
+        parallelnor
 from openeeprom.client import OpenEEPROMClient
+from openeeprom.daemon import OpenEEPROMDaemon, OpenEEPROMDaemonClient, DEFAULT_SOCKET_PATH
+from openeeprom.batch import load_batch, run_batch
+from openeeprom.jobs import open_transport, load_programmers
+from openeeprom.stress import STRESS_PATTERNS, stress_test, failing_bits
+from openeeprom.transport.capture import RecordingTransport, ReplayTransport, decode_capture
 
 DESCRIPTION = '''
 A tool for accessing EEPROM and flash chips.
@@ -15,31 +23,54 @@ A tool for accessing EEPROM and flash chips.
 SUPPORTED_DEVICES = {
         '25LC320': microchip25lc320.MC25LC320(),
         'AT28C256': at28c256.AT28C256(),
+        '24C01': at24cxx.AT24C01(),
+        '24C02': at24cxx.AT24C02(),
+        '24C04': at24cxx.AT24C04(),
+        '24C08': at24cxx.AT24C08(),
+        '24C16': at24cxx.AT24C16(),
+        '24C32': at24cxx.AT24C32(),
+        '24C64': at24cxx.AT24C64(),
+        '24C128': at24cxx.AT24C128(),
+        '24C256': at24cxx.AT24C256(),
+        '24C512': at24cxx.AT24C512(),
+        'SST39SF010A': parallelnor.SST39SF010A(),
+        'SST39SF020A': parallelnor.SST39SF020A(),
+        'SST39SF040': parallelnor.SST39SF040(),
+        'AM29F010': parallelnor.AM29F010(),
+        'AM29F040': parallelnor.AM29F040(),
 }
 
 
 def parse_args():
     parser = argparse.ArgumentParser(prog='openeeprom', description=DESCRIPTION, usage='%(prog)s <command> [options]')
-    parser.add_argument('command', help='read, write, erase, verify, list')
+    parser.add_argument('command', help='read, write, erase, verify, stress-test, list, serve, batch, decode')
     parser.add_argument('--chip', help="run command 'list' to view supported chips")
     parser.add_argument('--serial', type=str)
     parser.add_argument('--tcp', type=str)
     parser.add_argument('--offset', type=str, default=0)
     parser.add_argument('--count', type=str)
     parser.add_argument('--file', type=str)
+    parser.add_argument('--pattern', type=str, choices=[*STRESS_PATTERNS, 'all'], default='all', help="pattern for command 'stress-test'")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the 'random' stress-test pattern")
+    parser.add_argument('--config', type=str, help="programmer configuration for command 'serve'")
+    parser.add_argument('--report', type=str, help="file for the JSON report of command 'batch'")
+    parser.add_argument('--socket', type=str, help='send the command to a daemon listening on this socket')
+    parser.add_argument('--programmer', type=str, help='programmer to use when sending commands to a daemon')
+    parser.add_argument('--capture', type=str, help='record the traffic with the programmer to this file')
+    parser.add_argument('--replay', type=str, help='run the command against a capture instead of a programmer')
+    parser.add_argument('--replay-timing', action='store_true', help='reproduce the response times of the replayed capture')
     args = parser.parse_args()
     return args 
 
 
 def init_transport(args):
-    if args.serial:
-        port, baud_rate = args.serial.split(':')
-        baud_rate = int(baud_rate)
-        transport = SerialTransport(port, baud_rate)
-    elif args.tcp:
-        hostname, port = args.tcp.split(':')
-        port = int(port)
-        transport = TcpTransport(hostname, port)
+    if args.replay:
+        transport = ReplayTransport(args.replay, timing=args.replay_timing)
+    else:
+        transport = open_transport(vars(args))
+
+    if args.capture:
+        transport = RecordingTransport(transport, args.capture)
 
     return transport
 
@@ -92,26 +123,132 @@ def do_verify(chip, args):
     print('Contents are equivalent.')
 
 
+def do_stress_test(chip, args):
+    offset = int(args.offset)
+    count = int(args.count) if args.count else chip.size - offset
+    patterns = list(STRESS_PATTERNS) if args.pattern == 'all' else [args.pattern]
+
+    passed = True
+    for pattern in patterns:
+        result = stress_test(chip, pattern, offset, count, seed=args.seed)
+        for address, expected, actual in result.failures:
+            bits = ', '.join(str(bit) for bit in failing_bits(expected, actual))
+            print(f'{pattern}: failure at offset 0x{address:X}. 0x{expected:02X} (expected) != 0x{actual:02X} (chip), bits {bits}.')
+        if result.failure_count > len(result.failures):
+            print(f'{pattern}: {result.failure_count - len(result.failures)} more failures not shown.')
+        if result.passed:
+            print(f'{pattern}: passed.')
+        else:
+            counts = ', '.join(f'{bit}: {count}' for bit, count in enumerate(result.bit_failures) if count)
+            print(f'{pattern}: {result.failure_count} of {result.bytes_tested} bytes failed. Failures per bit: {counts}.')
+            passed = False
+
+    if not passed:
+        sys.exit(1)
+
+
+def do_serve(args):
+    with open(args.config) as f:
+        config = json.load(f)
+
+    programmers = load_programmers(config['programmers'], SUPPORTED_DEVICES)
+    server = OpenEEPROMDaemon(args.socket or DEFAULT_SOCKET_PATH, programmers)
+    print(f"Serving {', '.join(programmers)} on {server.server_address}.")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def do_batch(args):
+    batch = load_batch(args.file)
+    programmers = load_programmers(batch['programmers'], SUPPORTED_DEVICES)
+    try:
+        report = run_batch(batch['steps'], programmers, os.path.dirname(os.path.abspath(args.file)))
+    finally:
+        for programmer in programmers.values():
+            programmer.close()
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+
+    if report['status'] != 'ok':
+        sys.exit(1)
+
+
+def do_decode(args):
+    for line in decode_capture(args.file):
+        print(line)
+
+
+def do_remote(args):
+    job = {
+            'programmer': args.programmer,
+            'chip': args.chip,
+            'command': args.command,
+            'offset': int(args.offset),
+    }
+    if args.count:
+        job['count'] = int(args.count)
+    if args.file:
+        job['file'] = os.path.abspath(args.file)  # the daemon may run from another directory
+
+    client = OpenEEPROMDaemonClient(args.socket)
+    try:
+        result = client.submit(job)
+    finally:
+        client.close()
+
+    if args.command == 'read' and not args.file:
+        sys.stdout.buffer.write(base64.b64decode(result['data']))
+    elif args.command == 'erase':
+        print('Chip erase complete.')
+    elif args.command == 'verify':
+        for offset, expected, actual in result['mismatches']:
+            print(f'Difference at offset {offset}. {expected} (file) != {actual} (chip).')
+        if not result['mismatches']:
+            print('Contents are equivalent.')
+
+
 def main():
     args = parse_args()
     
     if args.command == 'list':
         do_list()
+    elif args.command == 'serve':
+        do_serve(args)
+    elif args.command == 'batch':
+        do_batch(args)
+    elif args.command == 'decode':
+        do_decode(args)
+    elif args.socket:
+        do_remote(args)
     else:
         transport = init_transport(args)
 
-        chip = SUPPORTED_DEVICES[args.chip]
-        client = OpenEEPROMClient(transport)
-        chip.connect(client)
-
-        if args.command == 'read':
-            do_read(chip,args)
-        elif args.command == 'write':
-            do_write(chip, args) 
-        elif args.command == 'erase':
-            do_erase(chip)
-        elif args.command == 'verify':
-            do_verify(chip, args)
+        try:
+            chip = SUPPORTED_DEVICES[args.chip]
+            client = OpenEEPROMClient(transport)
+            chip.connect(client)
+
+            if args.command == 'read':
+                do_read(chip,args)
+            elif args.command == 'write':
+                do_write(chip, args) 
+            elif args.command == 'erase':
+                do_erase(chip)
+            elif args.command == 'verify':
+                do_verify(chip, args)
+            elif args.command == 'stress-test':
+                do_stress_test(chip, args)
+        finally:
+            transport.close()  # also completes any capture file
 
 
 if __name__ == '__main__':
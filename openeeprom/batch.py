@@ -0,0 +1,155 @@
+from concurrent.futures import Future
+from typing import Dict, List, Set
+import json
+import os
+import time
+
+from openeeprom.jobs import Programmer, OpenEEPROMJobFailedException, get_programmer
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None  # Python < 3.11, only JSON job files are supported
+
+
+# A job file lists the programmers, as in the daemon configuration, and the steps to run:
+#
+#     {"programmers": {"station1": {"serial": "/dev/ttyACM0:115200"}},
+#      "steps": [{"name": "image", "chip": "25LC320", "command": "write", "file": "image.bin"},
+#                {"chip": "25LC320", "command": "verify", "file": "image.bin", "after": ["image"]}]}
+#
+# Steps take the same fields as daemon jobs plus an optional name and a list of
+# steps they must run "after". "programmer" can be left out if there is only one.
+# A step's status is "ok", "error", "mismatch" for a verify that found differences,
+# or "skipped" if a step it depends on didn't succeed.
+
+
+def load_batch(path: str) -> dict:
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise OpenEEPROMJobFailedException('TOML job files need Python 3.11 or later.')
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def step_dependencies(steps: List[dict]) -> List[Set[int]]:
+    # Steps may only be reordered if they are independent. A step depends on
+    # earlier steps on the same chip, earlier steps using a file it writes or
+    # writing a file it uses, and the steps listed in its "after".
+    names = {}
+    dependencies = []
+    for idx, step in enumerate(steps):
+        depends = set()
+        for earlier_idx, earlier in enumerate(steps[:idx]):
+            if (earlier['programmer'], earlier['chip']) == (step['programmer'], step['chip']) \
+                    or _files_conflict(earlier, step):
+                depends.add(earlier_idx)
+
+        for name in step.get('after', []):
+            if name not in names:
+                raise OpenEEPROMJobFailedException(f"Step '{step['name']}' runs after unknown or later step '{name}'.")
+            depends.add(names[name])
+
+        if step['name'] in names:
+            # unnamed steps are named by their index, which a named step can clash with
+            raise OpenEEPROMJobFailedException(f"Duplicate step name '{step['name']}'.")
+        names[step['name']] = idx
+        dependencies.append(depends)
+
+    return dependencies
+
+
+def plan_batch(steps: List[dict], dependencies: List[Set[int]]) -> List[int]:
+    # Greedy list scheduling: of the steps whose dependencies are scheduled,
+    # take the first one that uses the chip its programmer is already set up
+    # for, else the first one in file order. Dependencies always point to
+    # earlier steps, so there is always a step that is ready.
+    current_chips = {}
+    scheduled = set()
+    remaining = list(range(len(steps)))
+    order = []
+
+    while remaining:
+        ready = [idx for idx in remaining if dependencies[idx] <= scheduled]
+        idx = next((idx for idx in ready
+                    if current_chips.get(steps[idx]['programmer'], steps[idx]['chip']) == steps[idx]['chip']),
+                   ready[0])
+        current_chips[steps[idx]['programmer']] = steps[idx]['chip']
+        scheduled.add(idx)
+        remaining.remove(idx)
+        order.append(idx)
+
+    return order
+
+
+def run_batch(steps: List[dict], programmers: Dict[str, Programmer], base_dir: str='') -> dict:
+    steps = [_normalize_step(idx, step, programmers, base_dir) for idx, step in enumerate(steps)]
+    dependencies = step_dependencies(steps)
+    order = plan_batch(steps, dependencies)
+
+    # Each programmer runs its steps one at a time in planned order while the
+    # programmers run in parallel. A step waits for steps on other
+    # programmers it depends on; those were planned earlier, so it can't deadlock.
+    start_time = time.perf_counter()
+    futures: Dict[int, Future] = {}
+    for idx in order:
+        programmer = programmers[steps[idx]['programmer']]
+        after = [futures[dep] for dep in dependencies[idx]]
+        futures[idx] = programmer.executor.submit(_run_step, programmer, steps[idx], after, start_time)
+
+    records = [futures[idx].result() for idx in range(len(steps))]
+    chip_changes = {name: 0 for name in programmers}
+    last_chips = {}
+    for idx in order:
+        step = steps[idx]
+        if last_chips.get(step['programmer'], step['chip']) != step['chip']:
+            chip_changes[step['programmer']] += 1
+        last_chips[step['programmer']] = step['chip']
+
+    return {
+        'status': 'ok' if all(record['status'] == 'ok' for record in records) else 'error',
+        'duration': time.perf_counter() - start_time,
+        'order': [steps[idx]['name'] for idx in order],
+        'chip_changes': chip_changes,
+        'steps': records,
+    }
+
+
+def _normalize_step(idx: int, step: dict, programmers: Dict[str, Programmer], base_dir: str) -> dict:
+    step = dict(step)
+    step.setdefault('name', str(idx))
+    step['programmer'] = get_programmer(programmers, step.get('programmer')).name
+    if step.get('chip') not in programmers[step['programmer']].devices:
+        raise OpenEEPROMJobFailedException(f"Step '{step['name']}' uses an unsupported chip: {step.get('chip')}")
+    if step.get('file'):
+        step['file'] = os.path.join(base_dir, step['file'])  # relative to the job file
+    return step
+
+
+def _files_conflict(earlier: dict, later: dict) -> bool:
+    # only reads write to their file, the other commands read from it
+    if not earlier.get('file') or earlier.get('file') != later.get('file'):
+        return False
+    return earlier.get('command') == 'read' or later.get('command') == 'read'
+
+
+def _run_step(programmer: Programmer, step: dict, after: List[Future], start_time: float) -> dict:
+    record = {key: step.get(key) for key in ('name', 'programmer', 'chip', 'command')}
+    if any(future.result()['status'] != 'ok' for future in after):
+        record['status'] = 'skipped'
+        return record
+
+    start = time.perf_counter()
+    try:
+        record['result'] = programmer.run(step)
+        # a verify that found differences ran fine, but the chip doesn't hold what later steps expect
+        record['status'] = 'mismatch' if record['result'].get('mismatches') else 'ok'
+    except Exception as e:
+        record['status'] = 'error'
+        record['message'] = str(e)
+    record['start'] = start - start_time
+    record['duration'] = time.perf_counter() - start
+    return record
@@ -0,0 +1,143 @@
+from typing import List
+import struct
+import time
+
+from openeeprom.chip.basechip import BaseChip
+from openeeprom.client import OpenEEPROMClient, OpenEEPROMBusTypes, OpenEEPROMCommandFailedException
+
+
+class AT24Cxx(BaseChip):
+    def __init__(self, name: str, size: int, page_size: int, address_bytes: int, device_address: int=0x50, clock_freq: int=400000):
+        super().__init__(name, size)
+        self.page_size = page_size
+        self.address_bytes = address_bytes
+        # parts with a single address byte use the low bits of the device address as the upper address bits
+        self.block_mask = (size - 1) >> 8 if address_bytes == 1 else 0
+        self.device_address = device_address & ~self.block_mask
+        self.clock_freq = clock_freq
+        self.write_cycle_timeout = 0.02  # 5ms max write cycle plus polling overhead
+
+    def connect(self, client: OpenEEPROMClient):
+        self.client = client
+        if not self.client.get_supported_bus_types() & OpenEEPROMBusTypes.I2C:
+            raise OpenEEPROMCommandFailedException('The programmer does not support I2C.')
+        self.client.set_i2c_clock_freq(self.clock_freq)
+
+    def disconnect(self):
+        self.client.sync()
+        self.client = None
+
+    def read(self, address: int, byte_count: int) -> List[int]:
+        if address + byte_count > self.size or address < 0:
+            raise ValueError('Address out of range.')
+
+        result = []
+        addr_bytes = self._word_address(address)
+        while byte_count > 0:
+            read_count = min(byte_count, self.client.max_i2c_read_count)
+            # only the first transaction sets the address, after that the chip's
+            # internal address counter continues the sequential read
+            result.extend(self.client.i2c_transfer(self._device_address(address), addr_bytes, read_count))
+            addr_bytes = []
+            byte_count -= read_count
+            address += read_count
+
+        return result
+
+    def write(self, address: int, byte_list: List[int]) -> int:
+        byte_count = len(byte_list)
+        if address + byte_count > self.size or address < 0:
+            raise ValueError('Address out of range.')
+
+        offset = 0
+        while byte_count > 0:
+            remaining_bytes_in_page = self.page_size - (address % self.page_size)
+            write_count = min(byte_count, remaining_bytes_in_page, self.client.max_i2c_write_count - self.address_bytes)
+
+            cmd = [*self._word_address(address), *byte_list[offset:offset + write_count]]
+            self.client.i2c_transfer(self._device_address(address), cmd)
+            self._wait_write_cycle(address)
+
+            byte_count -= write_count
+            offset += write_count
+            address += write_count
+
+        return len(byte_list)
+
+    def erase(self) -> None:
+        self.write(0, [0xFF] * self.size)
+
+    def _device_address(self, address: int) -> int:
+        return self.device_address | ((address >> 8) & self.block_mask)
+
+    def _word_address(self, address: int) -> List[int]:
+        if self.address_bytes == 1:
+            return [address & 0xFF]
+        return list(struct.pack('>H', address))  # address is interpreted big-endian by the chip
+
+    def _wait_write_cycle(self, address: int):
+        # the chip doesn't acknowledge its address until the write cycle is complete
+        deadline = time.monotonic() + self.write_cycle_timeout
+        while not self.client.i2c_poll(self._device_address(address)):
+            if time.monotonic() > deadline:
+                raise OpenEEPROMCommandFailedException('Timed out waiting for the write cycle to complete.')
+
+
+class AT24C01(AT24Cxx):
+    def __init__(self):
+        super().__init__('24C01', 128, page_size=8, address_bytes=1)
+        self.description = '''Atmel 128B I2C EEPROM'''
+
+
+class AT24C02(AT24Cxx):
+    def __init__(self):
+        super().__init__('24C02', 256, page_size=8, address_bytes=1)
+        self.description = '''Atmel 256B I2C EEPROM'''
+
+
+class AT24C04(AT24Cxx):
+    def __init__(self):
+        super().__init__('24C04', 512, page_size=16, address_bytes=1)
+        self.description = '''Atmel 512B I2C EEPROM'''
+
+
+class AT24C08(AT24Cxx):
+    def __init__(self):
+        super().__init__('24C08', 1024, page_size=16, address_bytes=1)
+        self.description = '''Atmel 1KB I2C EEPROM'''
+
+
+class AT24C16(AT24Cxx):
+    def __init__(self):
+        super().__init__('24C16', 2048, page_size=16, address_bytes=1)
+        self.description = '''Atmel 2KB I2C EEPROM'''
+
+
+class AT24C32(AT24Cxx):
+    def __init__(self):
+        super().__init__('24C32', 4096, page_size=32, address_bytes=2)
+        self.description = '''Atmel 4KB I2C EEPROM'''
+
+
+class AT24C64(AT24Cxx):
+    def __init__(self):
+        super().__init__('24C64', 8192, page_size=32, address_bytes=2)
+        self.description = '''Atmel 8KB I2C EEPROM'''
+
+
+class AT24C128(AT24Cxx):
+    def __init__(self):
+        super().__init__('24C128', 16384, page_size=64, address_bytes=2)
+        self.description = '''Atmel 16KB I2C EEPROM'''
+
+
+class AT24C256(AT24Cxx):
+    def __init__(self):
+        super().__init__('24C256', 32768, page_size=64, address_bytes=2)
+        self.description = '''Atmel 32KB I2C EEPROM'''
+
+
+class AT24C512(AT24Cxx):
+    def __init__(self):
+        super().__init__('24C512', 65536, page_size=128, address_bytes=2)
+        self.description = '''Atmel 64KB I2C EEPROM'''
@@ -1,11 +1,11 @@
 import time
 from typing import List
 
-from .basechip import BaseChip
+from .basechip import ParallelChip
 from openeeprom.client import OpenEEPROMClient
 
 
-class AT28C256(BaseChip):
+class AT28C256(ParallelChip):
     def __init__(self):
         super().__init__('at28c256', 32768)
         self.description = '''Atmel Parallel EEPROM, 15-bit address bus'''
@@ -21,21 +21,6 @@ class AT28C256(BaseChip):
         self.client.sync()
         self.client = None
 
-    def read(self, address: int, byte_count: int) -> List[int]:
-        if address + byte_count > self.size or address < 0:
-            raise ValueError('Address out of range.')
-
-        result = []
-        offset = 0
-
-        while byte_count > 0:
-            read_count = min(byte_count, self.client.max_par_read_count)
-            result.extend(self.client.parallel_read(address + offset, read_count))
-            byte_count -= read_count
-            offset += read_count
-
-        return result
-
     def write(self, address: int, byte_list: List[int]) -> int:
         byte_count = len(byte_list)
         if address + byte_count > self.size or address < 0:
@@ -31,3 +31,23 @@ class BaseChip(ABC):
     def erase(self) -> None:
         pass
 
+
+class ParallelChip(BaseChip):
+    # Parallel chips read like memory, so the read is shared by their drivers.
+    def read(self, address: int, byte_count: int) -> List[int]:
+        if address + byte_count > self.size or address < 0:
+            raise ValueError('Address out of range.')
+
+        if self.client.can_stream_read():
+            return self.client.parallel_stream_read(address, byte_count)
+
+        result = []
+        offset = 0
+
+        while byte_count > 0:
+            read_count = min(byte_count, self.client.max_par_read_count)
+            result.extend(self.client.parallel_read(address + offset, read_count))
+            byte_count -= read_count
+            offset += read_count
+
+        return result
@@ -4,7 +4,7 @@ import struct
 import time
 
 from openeeprom.chip.basechip import BaseChip
-from openeeprom.client import OpenEEPROMClient
+from openeeprom.client import OpenEEPROMClient, OpenEEPROMFeatureVersions
 
 
 class MC25LC320Commands(Enum):
@@ -35,6 +35,13 @@ class MC25LC320(BaseChip):
         if address + byte_count > self.size or address < 0:
             raise ValueError('Address out of range.')
 
+        if self.client.can_stream_read():
+            addr_bytes = list(struct.pack('>H', address))  # address is interpreted big-endian by the chip
+            return self.client.spi_stream_read([MC25LC320Commands.READ.value, *addr_bytes], byte_count)
+
+        if self.client.supports(OpenEEPROMFeatureVersions.SPI_CS_HOLD):
+            return self._sequential_read(address, byte_count)
+
         result = []
         while byte_count > 0:
             read_count = min(byte_count, self.client.max_spi_transmit_count - 3)  # account for the 3 control bytes
@@ -52,6 +59,7 @@ class MC25LC320(BaseChip):
         if address + byte_count > self.size or address < 0:
             raise ValueError('Address out of range.')
 
+        cs_hold = self.client.supports(OpenEEPROMFeatureVersions.SPI_CS_HOLD)
         offset = 0
         while byte_count > 0:
             # set write latch to enable writing
@@ -60,10 +68,19 @@ class MC25LC320(BaseChip):
             
             addr_bytes = list(struct.pack('>H', address))  
             remaining_bytes_in_page = 32 - (address % 32)
-            write_count = min(byte_count, remaining_bytes_in_page, self.client.max_spi_transmit_count - 3)
+            if cs_hold:
+                # a whole page is written even if it takes several transmits
+                write_count = min(byte_count, remaining_bytes_in_page)
+            else:
+                write_count = min(byte_count, remaining_bytes_in_page, self.client.max_spi_transmit_count - 3)
 
             cmd = [MC25LC320Commands.WRITE.value, *addr_bytes, *byte_list[offset:offset + write_count]]
-            self.client.spi_transmit(cmd)
+            if len(cmd) > self.client.max_spi_transmit_count:
+                with self.client.spi_transaction():
+                    for start in range(0, len(cmd), self.client.max_spi_transmit_count):
+                        self.client.spi_transmit(cmd[start:start + self.client.max_spi_transmit_count])
+            else:
+                self.client.spi_transmit(cmd)
             time.sleep(0.005)  # 5ms write cycle
 
             byte_count -= write_count 
@@ -75,3 +92,16 @@ class MC25LC320(BaseChip):
     def erase(self) -> None:
         self.write(0, [0xFF] * self.size)
 
+    def _sequential_read(self, address: int, byte_count: int) -> List[int]:
+        # with CS held the READ command is only sent once, after which the
+        # chip keeps returning bytes from consecutive addresses
+        addr_bytes = list(struct.pack('>H', address))  # address is interpreted big-endian by the chip
+        result = []
+        with self.client.spi_transaction():
+            self.client.spi_transmit([MC25LC320Commands.READ.value, *addr_bytes])
+            while byte_count > 0:
+                read_count = min(byte_count, self.client.max_spi_transmit_count)
+                result.extend(self.client.spi_transmit([0] * read_count))
+                byte_count -= read_count
+        return result
+
@@ -0,0 +1,155 @@
+from enum import Enum
+from typing import List, Tuple
+import time
+
+from openeeprom.chip.basechip import ParallelChip
+from openeeprom.client import OpenEEPROMClient, OpenEEPROMCommandFailedException
+
+
+class ParallelNORCommands(Enum):
+    UNLOCK1 = 0xAA
+    UNLOCK2 = 0x55
+    BYTE_PROGRAM = 0xA0
+    ERASE_SETUP = 0x80
+    CHIP_ERASE = 0x10
+    SECTOR_ERASE = 0x30
+    PRODUCT_ID = 0x90
+    RESET = 0xF0
+
+
+class ParallelNORFlash(ParallelChip):
+    def __init__(self, name: str, size: int, address_bus_width: int, sector_size: int,
+                 unlock_addresses: Tuple[int, int], program_timeout: float, sector_erase_timeout: float, chip_erase_timeout: float):
+        super().__init__(name, size)
+        self.address_bus_width = address_bus_width
+        self.sector_size = sector_size
+        self.unlock_addresses = unlock_addresses
+        self.program_timeout = program_timeout
+        self.sector_erase_timeout = sector_erase_timeout
+        self.chip_erase_timeout = chip_erase_timeout
+
+    def connect(self, client: OpenEEPROMClient):
+        self.client = client
+        self.client.set_address_bus_width(self.address_bus_width)
+        self.client.set_address_hold_time(250)
+        self.client.set_pulse_width_time(250)
+
+    def disconnect(self):
+        self.client.sync()
+        self.client = None
+
+    def write(self, address: int, byte_list: List[int]) -> int:
+        byte_count = len(byte_list)
+        if address + byte_count > self.size or address < 0:
+            raise ValueError('Address out of range.')
+
+        offset = 0
+        while offset < byte_count:
+            start = address + offset
+            sector_start = start - (start % self.sector_size)
+            sector_end = sector_start + self.sector_size
+            end = min(sector_end, address + byte_count)
+            data = byte_list[offset:offset + end - start]
+
+            # programming can only clear bits, so the sector only needs to be
+            # erased if one of the new bytes sets a bit that is currently clear
+            current = self.read(start, len(data))
+            if any(new & ~old & 0xFF for old, new in zip(current, data)):
+                contents = self.read(sector_start, start - sector_start) + list(data) + self.read(end, sector_end - end)
+                self.erase_sector(sector_start)
+                self._program(sector_start, contents, [0xFF] * self.sector_size)
+            else:
+                self._program(start, data, current)
+
+            offset += len(data)
+
+        return byte_count
+
+    def erase(self) -> None:
+        self._command(ParallelNORCommands.ERASE_SETUP)
+        self._command(ParallelNORCommands.CHIP_ERASE)
+        self._wait_toggle(self.chip_erase_timeout)
+
+    def erase_sector(self, address: int) -> None:
+        if address >= self.size or address < 0:
+            raise ValueError('Address out of range.')
+
+        self._command(ParallelNORCommands.ERASE_SETUP)
+        self.client.parallel_write(self.unlock_addresses[0], [ParallelNORCommands.UNLOCK1.value])
+        self.client.parallel_write(self.unlock_addresses[1], [ParallelNORCommands.UNLOCK2.value])
+        self.client.parallel_write(address - (address % self.sector_size), [ParallelNORCommands.SECTOR_ERASE.value])
+        self._wait_toggle(self.sector_erase_timeout)
+
+    def read_product_id(self) -> Tuple[int, int]:
+        self._command(ParallelNORCommands.PRODUCT_ID)
+        manufacturer_id, device_id = self.client.parallel_read(0, 2)
+        self.client.parallel_write(0, [ParallelNORCommands.RESET.value])
+        return manufacturer_id, device_id
+
+    def _program(self, address: int, byte_list: List[int], current: List[int]):
+        for idx, (old, new) in enumerate(zip(current, byte_list)):
+            # bytes that already hold the value, including erased bytes, are skipped
+            if old == new:
+                continue
+            self._command(ParallelNORCommands.BYTE_PROGRAM)
+            self.client.parallel_write(address + idx, [new])
+            self._wait_data_polling(address + idx, new)
+
+    def _command(self, command: ParallelNORCommands):
+        self.client.parallel_write(self.unlock_addresses[0], [ParallelNORCommands.UNLOCK1.value])
+        self.client.parallel_write(self.unlock_addresses[1], [ParallelNORCommands.UNLOCK2.value])
+        self.client.parallel_write(self.unlock_addresses[0], [command.value])
+
+    def _wait_data_polling(self, address: int, value: int):
+        # DQ7 reads as the complement of the programmed bit until programming completes
+        deadline = time.monotonic() + self.program_timeout
+        while (self.client.parallel_read(address, 1)[0] ^ value) & 0x80:
+            if time.monotonic() > deadline:
+                raise OpenEEPROMCommandFailedException(f'Timed out programming address {address}.')
+
+    def _wait_toggle(self, timeout: float):
+        # DQ6 toggles on every read while an erase is in progress
+        deadline = time.monotonic() + timeout
+        previous = self.client.parallel_read(0, 1)[0]
+        while True:
+            status = self.client.parallel_read(0, 1)[0]
+            if not (status ^ previous) & 0x40:
+                return
+            if time.monotonic() > deadline:
+                raise OpenEEPROMCommandFailedException('Timed out waiting for erase to complete.')
+            previous = status
+
+
+class SST39SF010A(ParallelNORFlash):
+    def __init__(self):
+        super().__init__('SST39SF010A', 131072, 17, 4096, (0x5555, 0x2AAA),
+                         program_timeout=0.01, sector_erase_timeout=0.1, chip_erase_timeout=0.5)
+        self.description = '''Microchip SST 128KB Parallel NOR Flash, 17-bit address bus'''
+
+
+class SST39SF020A(ParallelNORFlash):
+    def __init__(self):
+        super().__init__('SST39SF020A', 262144, 18, 4096, (0x5555, 0x2AAA),
+                         program_timeout=0.01, sector_erase_timeout=0.1, chip_erase_timeout=0.5)
+        self.description = '''Microchip SST 256KB Parallel NOR Flash, 18-bit address bus'''
+
+
+class SST39SF040(ParallelNORFlash):
+    def __init__(self):
+        super().__init__('SST39SF040', 524288, 19, 4096, (0x5555, 0x2AAA),
+                         program_timeout=0.01, sector_erase_timeout=0.1, chip_erase_timeout=0.5)
+        self.description = '''Microchip SST 512KB Parallel NOR Flash, 19-bit address bus'''
+
+
+class AM29F010(ParallelNORFlash):
+    def __init__(self):
+        super().__init__('AM29F010', 131072, 17, 16384, (0x555, 0x2AA),
+                         program_timeout=0.01, sector_erase_timeout=8, chip_erase_timeout=64)
+        self.description = '''AMD 128KB Parallel NOR Flash, 17-bit address bus'''
+
+
+class AM29F040(ParallelNORFlash):
+    def __init__(self):
+        super().__init__('AM29F040', 524288, 19, 65536, (0x555, 0x2AA),
+                         program_timeout=0.01, sector_erase_timeout=8, chip_erase_timeout=64)
+        self.description = '''AMD 512KB Parallel NOR Flash, 19-bit address bus'''
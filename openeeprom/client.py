@@ -1,7 +1,9 @@
+from contextlib import contextmanager
 from enum import Enum
-from typing import List
+from typing import BinaryIO, Iterator, List, Union
 import struct
 
+from .compression import packbits_encode, packbits_decode
 from .transport.basetransport import BaseTransport
 
 
@@ -22,6 +24,18 @@ class OpenEEPROMCommands(Enum):
     SET_SPI_MODE = 13
     GET_SUPPORTED_SPI_MODES = 14
     SPI_TRANSMIT = 15
+    SET_I2C_CLOCK_FREQUENCY = 16
+    I2C_TRANSFER = 17
+    I2C_POLL = 18
+    PARALLEL_STREAM_READ = 19
+    SPI_STREAM_READ = 20
+    STREAM_CREDIT = 21
+    PARALLEL_WRITE_COMPRESSED = 22
+    SPI_TRANSMIT_COMPRESSED = 23
+    PARALLEL_STREAM_READ_COMPRESSED = 24
+    SPI_STREAM_READ_COMPRESSED = 25
+    SET_SPI_CS_HOLD = 26
+    STREAM_ABORT = 27
 
 
 class OpenEEPROMResponseStatus:
@@ -29,19 +43,52 @@ class OpenEEPROMResponseStatus:
     NAK = 0x06
 
 
+class OpenEEPROMEncodings:
+    RAW = 0x00
+    PACKBITS = 0x01
+
+
+class OpenEEPROMBusTypes:
+    PARALLEL = 0x01
+    SPI = 0x02
+    I2C = 0x04
+
+
+# Interface versions that introduced each optional feature.
+# The major version is in the upper byte and the minor version in the lower byte.
+class OpenEEPROMFeatureVersions:
+    I2C = 0x0101
+    STREAM_READ = 0x0102
+    COMPRESSION = 0x0103
+    SPI_CS_HOLD = 0x0104
+
+
 class OpenEEPROMCommandFailedException(Exception):
     pass
 
 
 class OpenEEPROMClient:
-    def __init__(self, io_handle: BaseTransport):
+    def __init__(self, io_handle: BaseTransport, cache_config: bool=False):
         self.io = io_handle
+        # When enabled, capability queries and bus configuration commands are
+        # only sent to the programmer if the value is not already known.
+        self.cache_config = cache_config
+        self._config = {}
+        self.interface_version = None
+        # number of blocks the programmer may send ahead of the host during a stream read
+        self.stream_window = 8
+        # use compressed commands when the programmer supports them and the data compresses
+        self.compression = True
+        # drivers read with stream reads when the programmer supports them
+        self.streaming = True
         self.sync()
         self.max_rx_size = self.get_max_rx_size()
         self.max_tx_size = self.get_max_tx_size()
         self.max_par_read_count = self.max_tx_size - 1
         self.max_par_write_count = self.max_rx_size - 9
         self.max_spi_transmit_count = min(self.max_rx_size - 5, self.max_tx_size - 1)
+        self.max_i2c_write_count = self.max_rx_size - 10
+        self.max_i2c_read_count = self.max_tx_size - 1
 
     def nop(self):
         cmd = bytes([OpenEEPROMCommands.NOP.value])
@@ -55,11 +102,15 @@ class OpenEEPROMClient:
         self._check_response_status()
 
     def get_interface_version(self) -> int:
+        if self._is_cached(OpenEEPROMCommands.GET_INTERFACE_VERSION):
+            return self._config[OpenEEPROMCommands.GET_INTERFACE_VERSION]
+
         cmd = bytes([OpenEEPROMCommands.GET_INTERFACE_VERSION.value])
         self.io.send(cmd)
         self._check_response_status()
         result = self.io.receive(2)
         version = struct.unpack_from('<H', result)[0]
+        self._config[OpenEEPROMCommands.GET_INTERFACE_VERSION] = version
         return version
 
     def get_max_rx_size(self) -> int:
@@ -91,14 +142,21 @@ class OpenEEPROMClient:
         return set_state 
 
     def get_supported_bus_types(self) -> int:
+        if self._is_cached(OpenEEPROMCommands.GET_SUPPORTED_BUS_TYPES):
+            return self._config[OpenEEPROMCommands.GET_SUPPORTED_BUS_TYPES]
+
         cmd = bytes([OpenEEPROMCommands.GET_SUPPORTED_BUS_TYPES.value])
         self.io.send(cmd)
         self._check_response_status()
         result = self.io.receive(1)
         supported_bus_types = struct.unpack_from('B', result)[0]
+        self._config[OpenEEPROMCommands.GET_SUPPORTED_BUS_TYPES] = supported_bus_types
         return supported_bus_types
 
     def set_address_bus_width(self, bus_width: int) -> int:
+        if self._is_cached(OpenEEPROMCommands.SET_ADDRESS_BUS_WIDTH, bus_width):
+            return bus_width
+
         cmd = bytes([OpenEEPROMCommands.SET_ADDRESS_BUS_WIDTH.value, bus_width])
         self.io.send(cmd)
         self._check_response_status()
@@ -108,9 +166,13 @@ class OpenEEPROMClient:
         if set_width != bus_width:
             raise OpenEEPROMCommandFailedException(f'Could not set bus to width {bus_width}. Max width is {set_width}.')
 
+        self._config[OpenEEPROMCommands.SET_ADDRESS_BUS_WIDTH] = set_width
         return set_width 
 
     def set_address_hold_time(self, hold_time: int) -> int:
+        if self._is_cached(OpenEEPROMCommands.SET_ADDRESS_HOLD_TIME, hold_time):
+            return hold_time
+
         cmd = bytes([OpenEEPROMCommands.SET_ADDRESS_HOLD_TIME.value]) + struct.pack('<I', hold_time)
         self.io.send(cmd)
         self._check_response_status()
@@ -121,9 +183,13 @@ class OpenEEPROMClient:
             raise OpenEEPROMCommandFailedException(f'Could not set address hold time to {100 * hold_time} ns. It is set to {100 * set_hold_time} ns.')
 
 
+        self._config[OpenEEPROMCommands.SET_ADDRESS_HOLD_TIME] = set_hold_time
         return set_hold_time
 
     def set_pulse_width_time(self, width_time: int) -> int:
+        if self._is_cached(OpenEEPROMCommands.SET_PULSE_WIDTH_TIME, width_time):
+            return width_time
+
         cmd = bytes([OpenEEPROMCommands.SET_PULSE_WIDTH_TIME.value]) + struct.pack('<I', width_time)
         self.io.send(cmd)
         self._check_response_status()
@@ -133,6 +199,7 @@ class OpenEEPROMClient:
         if set_width_time != width_time :
             raise OpenEEPROMCommandFailedException(f'Could not set pulse width time to {100 * width_time} ns. It is set to {100 * set_width_time} ns.')
 
+        self._config[OpenEEPROMCommands.SET_PULSE_WIDTH_TIME] = set_width_time
         return set_width_time
 
     def parallel_read(self, address: int, byte_count: int) -> List[int]:
@@ -152,11 +219,23 @@ class OpenEEPROMClient:
         if byte_count > self.max_par_write_count:
             raise OpenEEPROMCommandFailedException('Write count exceeds device receive buffer size.')
 
+        if self._use_compression():
+            encoded = packbits_encode(bytes(byte_list))
+            # only worth it if the payload shrinks by more than the 4-byte length parameter
+            if len(encoded) + 4 < byte_count:
+                cmd = bytes([OpenEEPROMCommands.PARALLEL_WRITE_COMPRESSED.value]) + struct.pack('<I', address) + struct.pack('<I', byte_count) + struct.pack('<I', len(encoded)) + encoded
+                self.io.send(cmd)
+                self._check_response_status()
+                return
+
         cmd = bytes([OpenEEPROMCommands.PARALLEL_WRITE.value]) + struct.pack('<I', address) + struct.pack('<I', byte_count) + bytes(byte_list)
         self.io.send(cmd)
         self._check_response_status()
             
     def set_spi_clock_freq(self, freq: int) -> int:
+        if self._is_cached(OpenEEPROMCommands.SET_SPI_CLOCK_FREQUENCY, freq):
+            return freq
+
         cmd = bytes([OpenEEPROMCommands.SET_SPI_CLOCK_FREQUENCY.value]) + struct.pack('<I', freq) 
         self.io.send(cmd)
         self._check_response_status()
@@ -166,9 +245,13 @@ class OpenEEPROMClient:
         if set_freq != freq:
             raise OpenEEPROMCommandFailedException(f'Could not set SPI clock frequency to {freq} Hz. It is set to {freq} Hz.')
 
+        self._config[OpenEEPROMCommands.SET_SPI_CLOCK_FREQUENCY] = set_freq
         return set_freq
 
     def set_spi_mode(self, mode: int) -> int:
+        if self._is_cached(OpenEEPROMCommands.SET_SPI_MODE, mode):
+            return mode
+
         cmd = bytes([OpenEEPROMCommands.SET_SPI_MODE.value]) + struct.pack('B', mode) 
         self.io.send(cmd)
         self._check_response_status()
@@ -178,14 +261,19 @@ class OpenEEPROMClient:
         if set_mode != mode:
             raise OpenEEPROMCommandFailedException(f'Could not set to SPI mode {mode}. It is set to mode {mode}.')
 
+        self._config[OpenEEPROMCommands.SET_SPI_MODE] = set_mode
         return set_mode 
         
     def get_supported_spi_modes(self) -> int:
+        if self._is_cached(OpenEEPROMCommands.GET_SUPPORTED_SPI_MODES):
+            return self._config[OpenEEPROMCommands.GET_SUPPORTED_SPI_MODES]
+
         cmd = bytes([OpenEEPROMCommands.GET_SUPPORTED_SPI_MODES.value])
         self.io.send(cmd)
         self._check_response_status()
         result = self.io.receive(1)
         supported_modes = struct.unpack('B', result)[0]
+        self._config[OpenEEPROMCommands.GET_SUPPORTED_SPI_MODES] = supported_modes
         return supported_modes
 
     def spi_transmit(self, byte_list: List[int]) -> List[int]:
@@ -194,6 +282,16 @@ class OpenEEPROMClient:
         if byte_count > self.max_spi_transmit_count:
             raise OpenEEPROMCommandFailedException('Transmit count must fit within device receive and transmit buffers.')
 
+        # the programmer may answer a compressed command with a raw frame,
+        # which has to fit in its transmit buffer along with the status
+        if byte_count <= self.max_tx_size - 2 and self._use_compression():
+            encoded = packbits_encode(bytes(byte_list))
+            if len(encoded) + 4 < byte_count:
+                cmd = bytes([OpenEEPROMCommands.SPI_TRANSMIT_COMPRESSED.value]) + struct.pack('<I', byte_count) + struct.pack('<I', len(encoded)) + encoded
+                self.io.send(cmd)
+                self._check_response_status()
+                return list(self._receive_frame(byte_count))
+
         cmd = bytes([OpenEEPROMCommands.SPI_TRANSMIT.value]) + struct.pack('<I', byte_count) + bytes(byte_list)
 
         self.io.send(cmd)
@@ -201,6 +299,196 @@ class OpenEEPROMClient:
         result = list(self.io.receive(byte_count))
         return result 
 
+    def set_spi_cs_hold(self, enable: bool) -> bool:
+        cmd = bytes([OpenEEPROMCommands.SET_SPI_CS_HOLD.value, int(enable)])
+        self.io.send(cmd)
+        self._check_response_status()
+        result = self.io.receive(1)
+        set_state = bool(struct.unpack('B', result)[0])
+
+        if set_state != enable:
+            raise OpenEEPROMCommandFailedException(f'Could not set SPI CS hold to {enable}.')
+
+        return set_state
+
+    @contextmanager
+    def spi_transaction(self) -> Iterator[None]:
+        # CS stays asserted across the SPI transfers made in the block, so
+        # they reach the chip as a single transaction
+        self.set_spi_cs_hold(True)
+        try:
+            yield
+        finally:
+            self.set_spi_cs_hold(False)
+
+    def set_i2c_clock_freq(self, freq: int) -> int:
+        if self._is_cached(OpenEEPROMCommands.SET_I2C_CLOCK_FREQUENCY, freq):
+            return freq
+
+        cmd = bytes([OpenEEPROMCommands.SET_I2C_CLOCK_FREQUENCY.value]) + struct.pack('<I', freq)
+        self.io.send(cmd)
+        self._check_response_status()
+        result = self.io.receive(4)
+        set_freq = struct.unpack('<I', result)[0]
+
+        if set_freq != freq:
+            raise OpenEEPROMCommandFailedException(f'Could not set I2C clock frequency to {freq} Hz. It is set to {set_freq} Hz.')
+
+        self._config[OpenEEPROMCommands.SET_I2C_CLOCK_FREQUENCY] = set_freq
+        return set_freq
+
+    def i2c_transfer(self, address: int, byte_list: List[int], read_count: int=0) -> List[int]:
+        write_count = len(byte_list)
+
+        if write_count > self.max_i2c_write_count:
+            raise OpenEEPROMCommandFailedException('Write count exceeds device receive buffer size.')
+        if read_count > self.max_i2c_read_count:
+            raise OpenEEPROMCommandFailedException('Read count exceeds device transmit buffer size.')
+
+        cmd = bytes([OpenEEPROMCommands.I2C_TRANSFER.value, address]) + struct.pack('<I', write_count) + struct.pack('<I', read_count) + bytes(byte_list)
+        self.io.send(cmd)
+        self._check_response_status()
+        result = list(self.io.receive(read_count))
+        return result
+
+    def i2c_poll(self, address: int) -> bool:
+        cmd = bytes([OpenEEPROMCommands.I2C_POLL.value, address])
+        self.io.send(cmd)
+        self._check_response_status()
+        result = self.io.receive(1)
+        acked = struct.unpack('B', result)[0]
+        return acked != 0
+
+    def parallel_stream_read(self, address: int, byte_count: int, sink: BinaryIO=None) -> Union[List[int], int]:
+        params = struct.pack('<I', address) + struct.pack('<I', byte_count)
+        if self._use_compression():
+            return self._stream_read(OpenEEPROMCommands.PARALLEL_STREAM_READ_COMPRESSED, params, b'', byte_count, sink)
+        return self._stream_read(OpenEEPROMCommands.PARALLEL_STREAM_READ, params, b'', byte_count, sink)
+
+    def spi_stream_read(self, byte_list: List[int], byte_count: int, sink: BinaryIO=None) -> Union[List[int], int]:
+        params = struct.pack('<I', len(byte_list)) + struct.pack('<I', byte_count)
+        if self._use_compression():
+            return self._stream_read(OpenEEPROMCommands.SPI_STREAM_READ_COMPRESSED, params, bytes(byte_list), byte_count, sink)
+        return self._stream_read(OpenEEPROMCommands.SPI_STREAM_READ, params, bytes(byte_list), byte_count, sink)
+
+    def supports(self, version: int) -> bool:
+        if self.interface_version is None:
+            self.interface_version = self.get_interface_version()
+        return self.interface_version >= version
+
+    def can_stream_read(self) -> bool:
+        return self.streaming and self.supports(OpenEEPROMFeatureVersions.STREAM_READ)
+
+    def invalidate_config(self):
+        self._config.clear()
+
+    def _is_cached(self, command: OpenEEPROMCommands, value: int=None) -> bool:
+        if not self.cache_config or command not in self._config:
+            return False
+        return value is None or self._config[command] == value
+
+    def _use_compression(self) -> bool:
+        return self.compression and self.supports(OpenEEPROMFeatureVersions.COMPRESSION)
+
+    def _receive_frame(self, byte_count: int) -> bytes:
+        # Raw frames are the encoding followed by the byte_count bytes, so data that
+        # doesn't compress only costs one byte. PackBits frames also have a 16-bit length.
+        encoding = self._receive_exact(1)[0]
+        if encoding == OpenEEPROMEncodings.RAW:
+            return self._receive_exact(byte_count)
+        elif encoding != OpenEEPROMEncodings.PACKBITS:
+            raise OpenEEPROMCommandFailedException(f'Unknown frame encoding: {encoding}')
+
+        length = struct.unpack('<H', self._receive_exact(2))[0]
+        data = packbits_decode(self._receive_exact(length))
+        if len(data) != byte_count:
+            raise OpenEEPROMCommandFailedException(f'Frame decoded to {len(data)} bytes instead of {byte_count}.')
+        return data
+
+    def _receive_exact(self, byte_count: int) -> bytes:
+        # a socket can return less than was asked for, and a frame can't be resynced mid-way
+        data = bytearray()
+        while len(data) < byte_count:
+            chunk = self.io.receive(byte_count - len(data))
+            if not chunk:
+                raise OpenEEPROMCommandFailedException(f'Frame ended {byte_count - len(data)} bytes short.')
+            data.extend(chunk)
+        return bytes(data)
+
+    def _stream_read(self, command: OpenEEPROMCommands, params: bytes, payload: bytes, byte_count: int, sink: BinaryIO) -> Union[List[int], int]:
+        if not self.supports(OpenEEPROMFeatureVersions.STREAM_READ):
+            raise OpenEEPROMCommandFailedException('The programmer does not support stream reads.')
+        if byte_count == 0:
+            return [] if sink is None else 0
+
+        # The programmer sends the data in blocks of max_tx_size bytes, one block per credit.
+        # Credits are returned as blocks arrive so the programmer never waits on the host.
+        # Compressed streams send each block as a frame, with one byte less so a raw frame fits.
+        compressed = command in (OpenEEPROMCommands.PARALLEL_STREAM_READ_COMPRESSED, OpenEEPROMCommands.SPI_STREAM_READ_COMPRESSED)
+        block_size = self.max_tx_size - 1 if compressed else self.max_tx_size
+        block_count = -(-byte_count // block_size)
+        credits = min(block_count, self.stream_window)
+
+        cmd = bytes([command.value]) + params + struct.pack('<H', credits) + payload
+        if len(cmd) > self.max_rx_size:
+            raise OpenEEPROMCommandFailedException('Command exceeds device receive buffer size.')
+
+        self.io.send(cmd)
+        self._check_response_status()
+
+        result = []
+        received = 0
+        frames = 0
+        try:
+            while received < byte_count:
+                if compressed:
+                    data = self._receive_frame(min(block_size, byte_count - received))
+                    frames += 1
+                else:
+                    block_remaining = block_size - (received % block_size)
+                    data = self.io.receive(min(byte_count - received, block_remaining))
+                if len(data) == 0:
+                    raise OpenEEPROMCommandFailedException(f'Stream ended after {received} of {byte_count} bytes.')
+                received += len(data)
+
+                granted = min(block_count, received // block_size + self.stream_window)
+                if granted > credits:
+                    self.io.send(bytes([OpenEEPROMCommands.STREAM_CREDIT.value]) + struct.pack('<H', granted - credits))
+                    credits = granted
+
+                if sink is None:
+                    result.extend(data)
+                else:
+                    sink.write(data)
+        except BaseException:
+            if received < byte_count:
+                if compressed:
+                    frame_sizes = [min(block_size, byte_count - idx * block_size) for idx in range(frames, credits)]
+                    self._abort_stream(pending_frames=frame_sizes)
+                else:
+                    self._abort_stream(pending_bytes=min(credits * block_size, byte_count) - received)
+            raise
+
+        return result if sink is None else byte_count
+
+    def _abort_stream(self, pending_bytes: int=0, pending_frames: List[int]=()):
+        # The programmer still sends the blocks it was given credits for, so
+        # they are read and discarded before the ACK ending the stream.
+        try:
+            self.io.send(bytes([OpenEEPROMCommands.STREAM_ABORT.value]))
+            for frame_size in pending_frames:
+                self._receive_frame(frame_size)
+            while pending_bytes > 0:
+                data = self.io.receive(pending_bytes)
+                if not data:
+                    break
+                pending_bytes -= len(data)
+            self._check_response_status()
+        except Exception:
+            # the link is out of step, so the original error is the one to
+            # report; callers recover with sync(), which also ends the stream
+            pass
+
     def _check_response_status(self):
         status = self.io.receive(1)[0]
         if status == OpenEEPROMResponseStatus.NAK:
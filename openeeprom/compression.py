@@ -0,0 +1,56 @@
+import re
+
+
+# PackBits run-length encoding. It is simple enough to decode on any MCU
+# and never grows the data by more than one byte in 128.
+#
+# Each packet starts with a header byte n:
+#     0 to 127      copy the next n + 1 bytes literally
+#     129 to 255    repeat the next byte 257 - n times
+#     128           no operation
+
+_RUN = re.compile(rb'(.)\1{2,}', re.DOTALL)
+_MAX_PACKET = 128
+
+
+def packbits_encode(data: bytes) -> bytes:
+    result = bytearray()
+    position = 0
+
+    for match in _RUN.finditer(data):
+        _append_literals(result, data[position:match.start()])
+        length = match.end() - match.start()
+        while length >= 3:
+            count = min(length, _MAX_PACKET)
+            result.append(257 - count)
+            result.extend(match.group(1))
+            length -= count
+        # a run of 1 or 2 left over is cheaper as part of the next literal packet
+        position = match.end() - length
+
+    _append_literals(result, data[position:])
+    return bytes(result)
+
+
+def packbits_decode(data: bytes) -> bytes:
+    result = bytearray()
+    idx = 0
+
+    while idx < len(data):
+        header = data[idx]
+        idx += 1
+        if header < 128:
+            result.extend(data[idx:idx + header + 1])
+            idx += header + 1
+        elif header > 128:
+            result.extend(data[idx:idx + 1] * (257 - header))
+            idx += 1
+
+    return bytes(result)
+
+
+def _append_literals(result: bytearray, literals: bytes):
+    for start in range(0, len(literals), _MAX_PACKET):
+        packet = literals[start:start + _MAX_PACKET]
+        result.append(len(packet) - 1)
+        result.extend(packet)
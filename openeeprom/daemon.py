@@ -0,0 +1,99 @@
+from typing import Dict
+import json
+import os
+import socket
+import socketserver
+import stat
+
+from openeeprom.jobs import Programmer, OpenEEPROMJobFailedException, get_programmer
+
+
+DEFAULT_SOCKET_PATH = '/tmp/openeeprom.sock'
+
+# Jobs and responses are exchanged as newline-delimited JSON objects.
+# A job is {"programmer": ..., "chip": ..., "command": ..., "offset": ..., "count": ..., "file": ...}
+# and is answered with {"status": "ok", "result": {...}} or {"status": "error", "message": ...}.
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                job = json.loads(line)
+                programmer = get_programmer(self.server.programmers, job.get('programmer'))
+                result = programmer.submit(job).result()
+                response = {'status': 'ok', 'result': result}
+            except Exception as e:
+                response = {'status': 'error', 'message': str(e)}
+
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+class OpenEEPROMDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, programmers: Dict[str, Programmer]):
+        self.programmers = programmers
+        self.socket_inode = None
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _JobHandler)
+
+    def server_bind(self):
+        super().server_bind()
+        self.socket_inode = os.stat(self.server_address).st_ino
+
+    def server_close(self):
+        super().server_close()
+        for programmer in self.programmers.values():
+            programmer.close()
+        # another daemon may have replaced the socket since, so only remove our own
+        try:
+            if os.stat(self.server_address).st_ino == self.socket_inode:
+                os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(socket_path: str):
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f'{socket_path} exists and is not a socket.')
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)  # left behind by a daemon that did not shut down cleanly
+        return
+    finally:
+        probe.close()
+
+    raise FileExistsError(f'A daemon is already listening on {socket_path}.')
+
+
+class OpenEEPROMDaemonClient:
+    def __init__(self, socket_path: str=DEFAULT_SOCKET_PATH):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path)
+        self.rfile = self.socket.makefile('rb')
+
+    def submit(self, job: dict) -> dict:
+        self.socket.sendall(json.dumps(job).encode() + b'\n')
+        line = self.rfile.readline()
+        if not line:
+            raise OpenEEPROMJobFailedException('The daemon closed the connection.')
+
+        response = json.loads(line)
+        if response['status'] != 'ok':
+            raise OpenEEPROMJobFailedException(response['message'])
+
+        return response['result']
+
+    def close(self):
+        self.rfile.close()
+        self.socket.close()
+        self.socket = None
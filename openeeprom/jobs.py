@@ -0,0 +1,134 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+import base64
+
+from openeeprom.chip.basechip import BaseChip
+from openeeprom.client import OpenEEPROMClient
+from openeeprom.transport.basetransport import BaseTransport
+
+
+class OpenEEPROMJobFailedException(Exception):
+    pass
+
+
+def open_transport(spec: dict) -> BaseTransport:
+    # Transports are imported here so that only the dependencies of the
+    # transport actually in use need to be installed.
+    if spec.get('serial'):
+        from openeeprom.transport.serial import SerialTransport
+        port, baud_rate = spec['serial'].split(':')
+        return SerialTransport(port, int(baud_rate))
+    elif spec.get('tcp'):
+        from openeeprom.transport.tcp import TcpTransport
+        hostname, port = spec['tcp'].split(':')
+        return TcpTransport(hostname, int(port))
+
+    raise OpenEEPROMJobFailedException('A programmer needs either a serial or tcp transport.')
+
+
+def run_job(chip: BaseChip, job: dict) -> dict:
+    command = job.get('command')
+    offset = int(job.get('offset', 0))
+
+    if command == 'read':
+        count = int(job['count']) if job.get('count') is not None else chip.size - offset
+        data = bytes(chip.read(offset, count))
+        if job.get('file'):
+            with open(job['file'], 'wb') as f:
+                f.write(data)
+            return {'count': len(data)}
+        return {'count': len(data), 'data': base64.b64encode(data).decode('ascii')}
+
+    elif command == 'write':
+        data = _job_data(job)
+        return {'count': chip.write(offset, list(data))}
+
+    elif command == 'erase':
+        chip.erase()
+        return {}
+
+    elif command == 'verify':
+        data = _job_data(job)
+        chip_contents = chip.read(offset, len(data))
+        mismatches = [[offset + idx, expected, actual]
+                      for idx, (expected, actual) in enumerate(zip(data, chip_contents))
+                      if expected != actual]
+        return {'count': len(data), 'mismatches': mismatches}
+
+    raise OpenEEPROMJobFailedException(f'Unknown command: {command}')
+
+
+def _job_data(job: dict) -> bytes:
+    if job.get('file'):
+        with open(job['file'], 'rb') as f:
+            return f.read()
+    elif job.get('data') is not None:
+        return base64.b64decode(job['data'])
+
+    raise OpenEEPROMJobFailedException(f"Command '{job.get('command')}' needs a file or data.")
+
+
+# A programmer with a persistent client connection. Jobs are queued and run
+# one at a time in submission order. The client caches its configuration, so
+# connecting a chip whose settings are already applied sends no commands.
+class Programmer:
+    def __init__(self, name: str, transport: BaseTransport, devices: Dict[str, BaseChip]):
+        self.name = name
+        self.client = OpenEEPROMClient(transport, cache_config=True)
+        self.devices = devices
+        self.chips = {}
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'programmer-{name}')
+
+    def submit(self, job: dict) -> Future:
+        return self.executor.submit(self.run, job)
+
+    def run(self, job: dict) -> dict:
+        try:
+            chip = self.get_chip(job.get('chip'))
+            return run_job(chip, job)
+        except Exception:
+            # the programmer state is unknown after a failure, so reconfigure on the next job
+            self.client.invalidate_config()
+            try:
+                self.client.sync()
+            except Exception:
+                pass  # the original error says more about what went wrong
+            raise
+
+    def get_chip(self, chip_name: str) -> BaseChip:
+        if chip_name not in self.devices:
+            raise OpenEEPROMJobFailedException(f'Unsupported chip: {chip_name}')
+
+        chip = self.chips.get(chip_name)
+        if chip is None:
+            # each programmer gets its own driver instance since drivers hold a client
+            chip = type(self.devices[chip_name])()
+            self.chips[chip_name] = chip
+
+        chip.connect(self.client)
+        return chip
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.client.io.close()
+
+
+def load_programmers(config: Dict[str, dict], devices: Dict[str, BaseChip]) -> Dict[str, Programmer]:
+    programmers = {}
+    try:
+        for name, spec in config.items():
+            programmers[name] = Programmer(name, open_transport(spec), devices)
+    except Exception:
+        for programmer in programmers.values():
+            programmer.close()
+        raise
+
+    return programmers
+
+
+def get_programmer(programmers: Dict[str, Programmer], name: str=None) -> Programmer:
+    if name is None and len(programmers) == 1:
+        return next(iter(programmers.values()))
+    if name not in programmers:
+        raise OpenEEPROMJobFailedException(f'Unknown programmer: {name}')
+    return programmers[name]
@@ -0,0 +1,135 @@
+from typing import Callable, Dict, List, Tuple
+import random
+
+from openeeprom.chip.basechip import BaseChip
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # patterns are generated with bytes operations instead
+
+
+# A pattern is generated for one chunk at a time from the chunk's start
+# address and length, so the whole range never has to be held in memory.
+PatternGenerator = Callable[[int, int], bytes]
+
+
+def _checkerboard(inverted: bool) -> PatternGenerator:
+    first, second = (0xAA, 0x55) if inverted else (0x55, 0xAA)
+
+    def generate(address: int, byte_count: int) -> bytes:
+        if np is not None:
+            data = np.full(byte_count, first, dtype=np.uint8)
+            data[(address + 1) % 2::2] = second
+            return data.tobytes()
+        pair = bytes([first, second]) if address % 2 == 0 else bytes([second, first])
+        return (pair * (byte_count // 2 + 1))[:byte_count]
+
+    return generate
+
+
+def _walking_ones(shift: int) -> PatternGenerator:
+    # Each byte has a single bit set, chosen by its address and the pass.
+    # Over the 8 passes every bit of every byte is set once.
+    def generate(address: int, byte_count: int) -> bytes:
+        if np is not None:
+            return (np.uint8(1) << ((np.arange(address, address + byte_count) + shift) % 8).astype(np.uint8)).tobytes()
+        start = address + shift
+        group = bytes(1 << ((start + i) % 8) for i in range(8))
+        return (group * (byte_count // 8 + 1))[:byte_count]
+
+    return generate
+
+
+def _address_in_address(address: int, byte_count: int) -> bytes:
+    # the upper address bytes are folded in so that aliased upper address lines show up
+    if np is not None:
+        addresses = np.arange(address, address + byte_count, dtype=np.uint32)
+        return (addresses ^ (addresses >> 8) ^ (addresses >> 16) ^ (addresses >> 24)).astype(np.uint8).tobytes()
+    return bytes((a ^ (a >> 8) ^ (a >> 16) ^ (a >> 24)) & 0xFF for a in range(address, address + byte_count))
+
+
+def _random(seed: int) -> PatternGenerator:
+    def generate(address: int, byte_count: int) -> bytes:
+        # seeded per chunk so the verify pass can regenerate any chunk
+        return random.Random(f'{seed}:{address}').randbytes(byte_count)
+
+    return generate
+
+
+# pattern name: function returning the generators for each pass of the pattern
+STRESS_PATTERNS: Dict[str, Callable[[int], List[PatternGenerator]]] = {
+    'checkerboard': lambda seed: [_checkerboard(False), _checkerboard(True)],
+    'walking-ones': lambda seed: [_walking_ones(shift) for shift in range(8)],
+    'address-in-address': lambda seed: [_address_in_address],
+    'random': lambda seed: [_random(seed)],
+}
+
+
+class StressTestResult:
+    def __init__(self, max_failures: int):
+        self.max_failures = max_failures
+        self.bytes_tested = 0
+        self.failure_count = 0
+        # (address, expected, actual) for the first max_failures failing bytes
+        self.failures: List[Tuple[int, int, int]] = []
+        # number of failing bytes for each bit position
+        self.bit_failures = [0] * 8
+
+    @property
+    def passed(self) -> bool:
+        return self.failure_count == 0
+
+    def compare(self, address: int, expected: bytes, actual: bytes):
+        self.bytes_tested += len(expected)
+
+        if np is not None:
+            diff = np.frombuffer(expected, dtype=np.uint8) ^ np.frombuffer(actual, dtype=np.uint8)
+            offsets = np.flatnonzero(diff)
+            if not offsets.size:
+                return
+            bits = np.unpackbits(diff[offsets, None], axis=1, bitorder='little').sum(axis=0)
+            self.bit_failures = (bits + self.bit_failures).tolist()
+            offsets = offsets.tolist()
+        else:
+            diff = int.from_bytes(expected, 'little') ^ int.from_bytes(actual, 'little')
+            if not diff:
+                return
+            diff = diff.to_bytes(len(expected), 'little')
+            offsets = [i for i, byte in enumerate(diff) if byte]
+            for i in offsets:
+                for bit in range(8):
+                    self.bit_failures[bit] += (diff[i] >> bit) & 1
+
+        self.failure_count += len(offsets)
+        for i in offsets[:self.max_failures - len(self.failures)]:
+            self.failures.append((address + i, expected[i], actual[i]))
+
+
+def failing_bits(expected: int, actual: int) -> List[int]:
+    diff = expected ^ actual
+    return [bit for bit in range(8) if diff & (1 << bit)]
+
+
+def stress_test(chip: BaseChip, pattern: str, address: int=0, byte_count: int=None, seed: int=0,
+                chunk_size: int=4096, max_failures: int=100) -> StressTestResult:
+    if pattern not in STRESS_PATTERNS:
+        raise ValueError(f'Unknown pattern: {pattern}')
+    if byte_count is None:
+        byte_count = chip.size - address
+    if address + byte_count > chip.size or address < 0:
+        raise ValueError('Address out of range.')
+
+    result = StressTestResult(max_failures)
+    end = address + byte_count
+    for generate in STRESS_PATTERNS[pattern](seed):
+        # the whole range is written before reading back, so a write that
+        # disturbs other addresses is caught as well
+        for start in range(address, end, chunk_size):
+            chip.write(start, list(generate(start, min(chunk_size, end - start))))
+
+        for start in range(address, end, chunk_size):
+            count = min(chunk_size, end - start)
+            result.compare(start, generate(start, count), bytes(chip.read(start, count)))
+
+    return result
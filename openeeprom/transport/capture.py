@@ -0,0 +1,306 @@
+from bisect import bisect_right
+from enum import Enum
+from typing import List, Tuple
+import struct
+import time
+
+from .basetransport import BaseTransport
+from openeeprom.client import OpenEEPROMCommands, OpenEEPROMResponseStatus, OpenEEPROMEncodings
+from openeeprom.compression import packbits_decode
+
+
+# A capture file starts with CAPTURE_MAGIC followed by one record per transport call:
+# <8-bit event> <64-bit microseconds since the capture started> <32-bit length> <data>
+CAPTURE_MAGIC = b'OEEPCAP\x01'
+_RECORD_HEADER = struct.Struct('<BQI')
+
+
+class CaptureEvents(Enum):
+    SEND = 0
+    RECEIVE = 1
+    FLUSH = 2
+
+
+class ReplayMismatchException(Exception):
+    pass
+
+
+def read_capture(path: str) -> List[Tuple[CaptureEvents, float, bytes]]:
+    with open(path, 'rb') as f:
+        contents = f.read()
+
+    if not contents.startswith(CAPTURE_MAGIC):
+        raise ValueError(f'{path} is not an OpenEEPROM capture.')
+
+    records = []
+    offset = len(CAPTURE_MAGIC)
+    while offset < len(contents):
+        event, timestamp, length = _RECORD_HEADER.unpack_from(contents, offset)
+        offset += _RECORD_HEADER.size
+        records.append((CaptureEvents(event), timestamp / 1e6, contents[offset:offset + length]))
+        offset += length
+
+    return records
+
+
+class RecordingTransport(BaseTransport):
+    def __init__(self, transport: BaseTransport, path: str):
+        self.transport = transport
+        self.file = open(path, 'wb')
+        self.file.write(CAPTURE_MAGIC)
+        self.start_time = time.perf_counter()
+
+    def send(self, byte_array: bytes) -> None:
+        self._record(CaptureEvents.SEND, byte_array)
+        self.transport.send(byte_array)
+
+    def receive(self, byte_count: int) -> bytes:
+        data = self.transport.receive(byte_count)
+        self._record(CaptureEvents.RECEIVE, data)
+        return data
+
+    def flush(self) -> None:
+        self.transport.flush()
+        self._record(CaptureEvents.FLUSH, b'')
+
+    def close(self) -> None:
+        self.transport.close()
+        self.file.close()
+
+    def _record(self, event: CaptureEvents, data: bytes):
+        timestamp = int((time.perf_counter() - self.start_time) * 1e6)
+        self.file.write(_RECORD_HEADER.pack(event.value, timestamp, len(data)) + data)
+
+
+class ReplayTransport(BaseTransport):
+    def __init__(self, path: str, timing: bool=False, strict: bool=True):
+        self.timing = timing
+        self.strict = strict
+        self.expected = bytearray()
+        self.sent_count = 0
+        self.frames = []
+        self.frame_offset = 0
+        self.last_send_time = time.perf_counter()
+
+        last_send = 0.0
+        for event, timestamp, data in read_capture(path):
+            if event == CaptureEvents.SEND:
+                self.expected.extend(data)
+                last_send = timestamp
+            elif event == CaptureEvents.RECEIVE and data:
+                # the delay between the last command and its response, which
+                # covers the link and the programmer but not the host
+                self.frames.append((timestamp - last_send, data))
+
+    def send(self, byte_array: bytes) -> None:
+        expected = self.expected[self.sent_count:self.sent_count + len(byte_array)]
+        if self.strict and expected != byte_array:
+            raise ReplayMismatchException(f'Sent data diverges from the capture at byte {self.sent_count}.')
+        self.sent_count += len(byte_array)
+        self.last_send_time = time.perf_counter()
+
+    def receive(self, byte_count: int) -> bytes:
+        data = bytearray()
+        while len(data) < byte_count and self.frames:
+            delay, frame = self.frames[0]
+            if self.timing:
+                remaining = self.last_send_time + delay - time.perf_counter()
+                if remaining > 0:
+                    time.sleep(remaining)
+
+            chunk = frame[self.frame_offset:self.frame_offset + byte_count - len(data)]
+            data.extend(chunk)
+            self.frame_offset += len(chunk)
+            if self.frame_offset == len(frame):
+                self.frames.pop(0)
+                self.frame_offset = 0
+
+        if len(data) < byte_count:
+            raise ReplayMismatchException(f'Capture ended {byte_count - len(data)} bytes short of the response.')
+        return bytes(data)
+
+    def flush(self) -> None:
+        return
+
+    def close(self) -> None:
+        return
+
+
+# command: (parameter format, parameter names, parameter giving the length of the trailing payload,
+#           response length as a byte count or parameter name, or None if there is no response)
+_COMMAND_FORMATS = {
+    OpenEEPROMCommands.NOP: ('', (), None, 0),
+    OpenEEPROMCommands.SYNC: ('', (), None, 0),
+    OpenEEPROMCommands.GET_INTERFACE_VERSION: ('', (), None, 2),
+    OpenEEPROMCommands.GET_MAX_RX_SIZE: ('', (), None, 4),
+    OpenEEPROMCommands.GET_MAX_TX_SIZE: ('', (), None, 4),
+    OpenEEPROMCommands.TOGGLE_IO: ('<B', ('state',), None, 1),
+    OpenEEPROMCommands.GET_SUPPORTED_BUS_TYPES: ('', (), None, 1),
+    OpenEEPROMCommands.SET_ADDRESS_BUS_WIDTH: ('<B', ('width',), None, 1),
+    OpenEEPROMCommands.SET_ADDRESS_HOLD_TIME: ('<I', ('time',), None, 4),
+    OpenEEPROMCommands.SET_PULSE_WIDTH_TIME: ('<I', ('time',), None, 4),
+    OpenEEPROMCommands.PARALLEL_READ: ('<II', ('address', 'count'), None, 'count'),
+    OpenEEPROMCommands.PARALLEL_WRITE: ('<II', ('address', 'count'), 'count', 0),
+    OpenEEPROMCommands.SET_SPI_CLOCK_FREQUENCY: ('<I', ('frequency',), None, 4),
+    OpenEEPROMCommands.SET_SPI_MODE: ('<B', ('mode',), None, 1),
+    OpenEEPROMCommands.GET_SUPPORTED_SPI_MODES: ('', (), None, 1),
+    OpenEEPROMCommands.SPI_TRANSMIT: ('<I', ('count',), 'count', 'count'),
+    OpenEEPROMCommands.SET_I2C_CLOCK_FREQUENCY: ('<I', ('frequency',), None, 4),
+    OpenEEPROMCommands.I2C_TRANSFER: ('<BII', ('address', 'write_count', 'read_count'), 'write_count', 'read_count'),
+    OpenEEPROMCommands.I2C_POLL: ('<B', ('address',), None, 1),
+    OpenEEPROMCommands.PARALLEL_STREAM_READ: ('<IIH', ('address', 'count', 'credits'), None, 'count'),
+    OpenEEPROMCommands.SPI_STREAM_READ: ('<IIH', ('header_count', 'count', 'credits'), 'header_count', 'count'),
+    OpenEEPROMCommands.STREAM_CREDIT: ('<H', ('credits',), None, None),
+    OpenEEPROMCommands.PARALLEL_WRITE_COMPRESSED: ('<III', ('address', 'count', 'length'), 'length', 0),
+    OpenEEPROMCommands.SPI_TRANSMIT_COMPRESSED: ('<II', ('count', 'length'), 'length', 'count'),
+    OpenEEPROMCommands.PARALLEL_STREAM_READ_COMPRESSED: ('<IIH', ('address', 'count', 'credits'), None, 'count'),
+    OpenEEPROMCommands.SPI_STREAM_READ_COMPRESSED: ('<IIH', ('header_count', 'count', 'credits'), 'header_count', 'count'),
+    OpenEEPROMCommands.SET_SPI_CS_HOLD: ('<B', ('enable',), None, 1),
+    OpenEEPROMCommands.STREAM_ABORT: ('', (), None, 0),
+}
+
+# commands whose response is sent as frames that decode to the response length
+_FRAMED_RESPONSES = {
+    OpenEEPROMCommands.SPI_TRANSMIT_COMPRESSED,
+    OpenEEPROMCommands.PARALLEL_STREAM_READ_COMPRESSED,
+    OpenEEPROMCommands.SPI_STREAM_READ_COMPRESSED,
+}
+
+_STREAM_READS = {
+    OpenEEPROMCommands.PARALLEL_STREAM_READ,
+    OpenEEPROMCommands.SPI_STREAM_READ,
+    OpenEEPROMCommands.PARALLEL_STREAM_READ_COMPRESSED,
+    OpenEEPROMCommands.SPI_STREAM_READ_COMPRESSED,
+}
+
+
+def decode_capture(path: str) -> List[str]:
+    sent, sent_times, received, received_times = _join_frames(read_capture(path))
+
+    lines = []
+    sent_offset = 0
+    received_offset = 0
+    max_tx_size = None  # needed for the block size of compressed streams
+    while sent_offset < len(sent):
+        timestamp = _frame_time(sent_times, sent_offset)
+        try:
+            command = OpenEEPROMCommands(sent[sent_offset])
+        except ValueError:
+            lines.append(f'{timestamp:12.6f}  unknown command 0x{sent[sent_offset]:02X}, stopping')
+            break
+
+        param_format, param_names, payload_param, response = _COMMAND_FORMATS[command]
+        try:
+            params = dict(zip(param_names, struct.unpack_from(param_format, sent, sent_offset + 1)))
+        except struct.error:
+            lines.append(f'{timestamp:12.6f}  {command.name} truncated')
+            break
+        payload_count = params[payload_param] if payload_param else 0
+        sent_offset += 1 + struct.calcsize(param_format) + payload_count
+
+        description = ' '.join([command.name] + [f'{name}={_format_param(name, value)}' for name, value in params.items()])
+        if response is None:
+            lines.append(f'{timestamp:12.6f}  {description}')
+            continue
+        if received_offset >= len(received):
+            lines.append(f'{timestamp:12.6f}  {description} -> no response')
+            continue
+
+        status = received[received_offset]
+        response_count = params[response] if isinstance(response, str) else response
+        aborted = False
+        if status == OpenEEPROMResponseStatus.ACK and command in _STREAM_READS and max_tx_size is not None:
+            # A stream that was aborted, or ended by another command, only sent
+            # the blocks it was given credits for.
+            block_size = max_tx_size - 1 if command in _FRAMED_RESPONSES else max_tx_size
+            credited = (params['credits'] + _following_credits(sent, sent_offset)) * block_size
+            if credited < response_count:
+                response_count = credited
+                aborted = True
+
+        if status == OpenEEPROMResponseStatus.ACK and command in _FRAMED_RESPONSES:
+            if command == OpenEEPROMCommands.SPI_TRANSMIT_COMPRESSED:
+                block_size = response_count
+            elif max_tx_size is None:
+                lines.append(f'{timestamp:12.6f}  {description} -> unknown TX buffer size, stopping')
+                break
+            else:
+                block_size = max_tx_size - 1
+            decoded_count, wire_count = _skip_frames(received, received_offset + 1, response_count, block_size)
+            result = f'ACK <{decoded_count} bytes as {wire_count}>'
+            received_offset += 1 + wire_count
+        elif status == OpenEEPROMResponseStatus.ACK:
+            payload = received[received_offset + 1:received_offset + 1 + response_count]
+            result = 'ACK' + _format_response(payload, isinstance(response, str))
+            if command == OpenEEPROMCommands.GET_MAX_TX_SIZE:
+                max_tx_size = int.from_bytes(payload, 'little')
+            received_offset += 1 + response_count
+        elif status == OpenEEPROMResponseStatus.NAK:
+            result = 'NAK'
+            received_offset += 1
+        else:
+            result = f'unknown status 0x{status:02X}'
+            received_offset += 1
+
+        if aborted:
+            result += ', aborted'
+        latency = _frame_time(received_times, received_offset - 1) - timestamp
+        lines.append(f'{timestamp:12.6f}  {description} -> {result} ({latency * 1000:.3f} ms)')
+
+    return lines
+
+
+def _following_credits(sent: bytes, offset: int) -> int:
+    # total of the stream_credit commands sent right after a stream read started
+    credits = 0
+    while offset + 3 <= len(sent) and sent[offset] == OpenEEPROMCommands.STREAM_CREDIT.value:
+        credits += struct.unpack_from('<H', sent, offset + 1)[0]
+        offset += 3
+    return credits
+
+
+def _skip_frames(received: bytes, offset: int, byte_count: int, block_size: int) -> Tuple[int, int]:
+    decoded_count = 0
+    wire_count = 0
+    while decoded_count < byte_count and offset + wire_count < len(received):
+        start = offset + wire_count
+        if received[start] == OpenEEPROMEncodings.PACKBITS:
+            length = struct.unpack_from('<H', received, start + 1)[0]
+            decoded_count += len(packbits_decode(received[start + 3:start + 3 + length]))
+            wire_count += 3 + length
+        else:
+            length = min(block_size, byte_count - decoded_count)
+            decoded_count += len(received[start + 1:start + 1 + length])
+            wire_count += 1 + length
+
+    return decoded_count, wire_count
+
+
+def _join_frames(records: List[Tuple[CaptureEvents, float, bytes]]):
+    streams = {CaptureEvents.SEND: (bytearray(), []), CaptureEvents.RECEIVE: (bytearray(), [])}
+    for event, timestamp, data in records:
+        if event in streams and data:
+            stream, times = streams[event]
+            times.append((len(stream), timestamp))
+            stream.extend(data)
+
+    sent, sent_times = streams[CaptureEvents.SEND]
+    received, received_times = streams[CaptureEvents.RECEIVE]
+    return bytes(sent), sent_times, bytes(received), received_times
+
+
+def _frame_time(times: List[Tuple[int, float]], offset: int) -> float:
+    idx = bisect_right(times, (offset, float('inf'))) - 1
+    return times[max(idx, 0)][1] if times else 0.0
+
+
+def _format_param(name: str, value: int) -> str:
+    return f'0x{value:X}' if name == 'address' else str(value)
+
+
+def _format_response(payload: bytes, variable_length: bool) -> str:
+    if variable_length:
+        return f' <{len(payload)} bytes>'
+    if payload:
+        return ' ' + str(int.from_bytes(payload, 'little'))
+    return ''
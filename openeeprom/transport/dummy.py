@@ -15,3 +15,5 @@ class DummyTransport(BaseTransport):
     def flush(self) -> None:
         return
 
+    def close(self) -> None:
+        return
@@ -0,0 +1,529 @@
+from typing import List, Optional, Tuple
+import struct
+
+from .basetransport import BaseTransport
+from openeeprom.client import OpenEEPROMCommands, OpenEEPROMResponseStatus, OpenEEPROMBusTypes, OpenEEPROMEncodings, \
+        OpenEEPROMFeatureVersions
+from openeeprom.compression import packbits_encode, packbits_decode
+
+
+# the emulator implements every feature the client knows about
+INTERFACE_VERSION = max(value for name, value in vars(OpenEEPROMFeatureVersions).items() if not name.startswith('_'))
+
+
+class EmulatedParallelMemory:
+    def __init__(self, size: int):
+        self.memory = bytearray([0xFF]) * size
+
+    def read(self, address: int) -> int:
+        return self.memory[address % len(self.memory)]
+
+    def write(self, address: int, value: int) -> None:
+        self.memory[address % len(self.memory)] = value
+
+
+class EmulatedNORFlash:
+    def __init__(self, size: int, sector_size: int, unlock_addresses: Tuple[int, int], product_id: Tuple[int, int],
+                 program_polls: int=1, erase_polls: int=3):
+        self.memory = bytearray([0xFF]) * size
+        self.size = size
+        self.sector_size = sector_size
+        self.unlock_addresses = unlock_addresses
+        self.product_id = product_id
+        # number of status reads before an embedded program or erase operation completes
+        self.program_polls = program_polls
+        self.erase_polls = erase_polls
+        self.cycle = 0
+        self.programming = False
+        self.id_mode = False
+        self.busy = 0
+        self.status = 0
+
+    def read(self, address: int) -> int:
+        if self.busy > 0:
+            self.busy -= 1
+            self.status ^= 0x40  # DQ6 toggles on every read
+            return self.status
+        if self.id_mode:
+            return self.product_id[address % 2]
+        return self.memory[address % self.size]
+
+    def write(self, address: int, value: int) -> None:
+        address %= self.size
+        if self.programming:
+            self.programming = False
+            self.memory[address] &= value
+            self._start(self.program_polls, ~value & 0x80)
+            return
+
+        if value == 0xF0:
+            self.cycle = 0
+            self.id_mode = False
+            return
+
+        unlock1, unlock2 = self.unlock_addresses
+        expected = {0: (unlock1, 0xAA), 1: (unlock2, 0x55), 3: (unlock1, 0xAA), 4: (unlock2, 0x55)}
+        if self.cycle in expected:
+            self.cycle = self.cycle + 1 if (address, value) == expected[self.cycle] else 0
+        elif self.cycle == 2 and address == unlock1:
+            self.cycle = 3 if value == 0x80 else 0
+            self.programming = value == 0xA0
+            self.id_mode = self.id_mode or value == 0x90
+        elif self.cycle == 5:
+            self.cycle = 0
+            if value == 0x10 and address == unlock1:
+                self.memory[:] = bytearray([0xFF]) * self.size
+                self._start(self.erase_polls, 0)
+            elif value == 0x30:
+                sector_start = address - (address % self.sector_size)
+                self.memory[sector_start:sector_start + self.sector_size] = bytearray([0xFF]) * self.sector_size
+                self._start(self.erase_polls, 0)
+        else:
+            self.cycle = 0
+
+    def _start(self, polls: int, status: int):
+        self.busy = polls
+        self.status = status
+
+
+class EmulatedSPIEEPROM:
+    READ = 0x03
+    WRITE = 0x02
+    WRDI = 0x04
+    WREN = 0x06
+    RDSR = 0x05
+
+    def __init__(self, size: int, page_size: int, address_bytes: int=2):
+        self.memory = bytearray([0xFF]) * size
+        self.size = size
+        self.page_size = page_size
+        self.address_bytes = address_bytes
+        self.write_enabled = False
+        self.received = bytearray()
+
+    def select(self):
+        self.received.clear()
+
+    def transfer(self, byte: int) -> int:
+        self.received.append(byte)
+        index = len(self.received) - 1
+        header_size = 1 + self.address_bytes
+
+        if self.received[0] == self.READ and index >= header_size:
+            return self.memory[(self._address() + index - header_size) % self.size]
+        elif self.received[0] == self.RDSR and index >= 1:
+            return 0x02 if self.write_enabled else 0x00
+        return 0xFF
+
+    def deselect(self):
+        if not self.received:
+            return
+
+        command = self.received[0]
+        if command == self.WREN:
+            self.write_enabled = True
+        elif command == self.WRDI:
+            self.write_enabled = False
+        elif command == self.WRITE and self.write_enabled:
+            address = self._address()
+            page_start = address - (address % self.page_size)
+            for idx, byte in enumerate(self.received[1 + self.address_bytes:]):
+                # writes past the end of the page wrap around to its start
+                self.memory[page_start + (address + idx) % self.page_size] = byte
+            self.write_enabled = False
+
+    def _address(self) -> int:
+        return int.from_bytes(self.received[1:1 + self.address_bytes], 'big') % self.size
+
+
+class EmulatedI2CEEPROM:
+    def __init__(self, size: int, page_size: int, address_bytes: int, device_address: int=0x50, write_cycle_polls: int=2):
+        self.memory = bytearray([0xFF]) * size
+        self.size = size
+        self.page_size = page_size
+        self.address_bytes = address_bytes
+        # parts with a single address byte take the upper address bits from the device address
+        self.block_mask = (size - 1) >> 8 if address_bytes == 1 else 0
+        self.device_address = device_address & ~self.block_mask
+        # number of transactions the device ignores after a page write, simulating the write cycle
+        self.write_cycle_polls = write_cycle_polls
+        self.busy = 0
+        self.pointer = 0
+
+    def poll(self, address: int) -> bool:
+        return self._acknowledge(address)
+
+    def transfer(self, address: int, byte_list: bytes, read_count: int) -> Optional[bytes]:
+        if not self._acknowledge(address):
+            return None
+
+        if len(byte_list) >= self.address_bytes:
+            word_address = int.from_bytes(byte_list[:self.address_bytes], 'big')
+            self.pointer = (((address & self.block_mask) << 8) | word_address) % self.size
+            self._page_write(byte_list[self.address_bytes:])
+
+        result = bytearray()
+        for _ in range(read_count):
+            result.append(self.memory[self.pointer])
+            self.pointer = (self.pointer + 1) % self.size
+
+        return bytes(result)
+
+    def _page_write(self, data: bytes):
+        if not data:
+            return
+
+        page_start = self.pointer - (self.pointer % self.page_size)
+        offset = self.pointer - page_start
+        for byte in data:
+            # writes past the end of the page wrap around to its start
+            self.memory[page_start + offset] = byte
+            offset = (offset + 1) % self.page_size
+
+        self.pointer = page_start + offset
+        self.busy = self.write_cycle_polls
+
+    def _acknowledge(self, address: int) -> bool:
+        if address & ~self.block_mask != self.device_address:
+            return False
+        if self.busy > 0:
+            self.busy -= 1
+            return False
+        return True
+
+
+# An in-process OpenEEPROM programmer for testing the client and chip drivers without hardware.
+class EmulatorTransport(BaseTransport):
+    def __init__(self, max_rx_size: int=256, max_tx_size: int=256, parallel_device=None, spi_device=None, i2c_devices: List=None):
+        self.max_rx_size = max_rx_size
+        self.max_tx_size = max_tx_size
+        self.max_address_bus_width = 32
+        self.parallel_device = parallel_device or EmulatedParallelMemory(2**16)
+        self.spi_device = spi_device
+        self.i2c_devices = i2c_devices or []
+        self.rxfifo = bytearray()
+        self.txfifo = bytearray()
+        self.stream = []
+        self.stream_credits = 0
+        self.spi_cs_hold = False
+        self.spi_selected = False
+        self.handlers = {
+            OpenEEPROMCommands.NOP: self._nop,
+            OpenEEPROMCommands.SYNC: self._nop,
+            OpenEEPROMCommands.GET_INTERFACE_VERSION: self._get_interface_version,
+            OpenEEPROMCommands.GET_MAX_RX_SIZE: self._get_max_rx_size,
+            OpenEEPROMCommands.GET_MAX_TX_SIZE: self._get_max_tx_size,
+            OpenEEPROMCommands.TOGGLE_IO: self._toggle_io,
+            OpenEEPROMCommands.GET_SUPPORTED_BUS_TYPES: self._get_supported_bus_types,
+            OpenEEPROMCommands.SET_ADDRESS_BUS_WIDTH: self._set_address_bus_width,
+            OpenEEPROMCommands.SET_ADDRESS_HOLD_TIME: self._echo_u32,
+            OpenEEPROMCommands.SET_PULSE_WIDTH_TIME: self._echo_u32,
+            OpenEEPROMCommands.PARALLEL_READ: self._parallel_read,
+            OpenEEPROMCommands.PARALLEL_WRITE: self._parallel_write,
+            OpenEEPROMCommands.SET_SPI_CLOCK_FREQUENCY: self._echo_u32,
+            OpenEEPROMCommands.SET_SPI_MODE: self._set_spi_mode,
+            OpenEEPROMCommands.GET_SUPPORTED_SPI_MODES: self._get_supported_spi_modes,
+            OpenEEPROMCommands.SPI_TRANSMIT: self._spi_transmit,
+            OpenEEPROMCommands.SET_I2C_CLOCK_FREQUENCY: self._echo_u32,
+            OpenEEPROMCommands.I2C_TRANSFER: self._i2c_transfer,
+            OpenEEPROMCommands.I2C_POLL: self._i2c_poll,
+            OpenEEPROMCommands.PARALLEL_STREAM_READ: self._parallel_stream_read,
+            OpenEEPROMCommands.SPI_STREAM_READ: self._spi_stream_read,
+            OpenEEPROMCommands.STREAM_CREDIT: self._stream_credit,
+            OpenEEPROMCommands.PARALLEL_WRITE_COMPRESSED: self._parallel_write_compressed,
+            OpenEEPROMCommands.SPI_TRANSMIT_COMPRESSED: self._spi_transmit_compressed,
+            OpenEEPROMCommands.PARALLEL_STREAM_READ_COMPRESSED: lambda params: self._parallel_stream_read(params, compressed=True),
+            OpenEEPROMCommands.SPI_STREAM_READ_COMPRESSED: lambda params: self._spi_stream_read(params, compressed=True),
+            OpenEEPROMCommands.SET_SPI_CS_HOLD: self._set_spi_cs_hold,
+            OpenEEPROMCommands.STREAM_ABORT: self._stream_abort,
+        }
+
+    def send(self, byte_array: bytes) -> None:
+        self.rxfifo.extend(byte_array)
+        self._process()
+
+    def receive(self, byte_count: int) -> bytes:
+        data = bytes(self.txfifo[:byte_count])
+        del self.txfifo[:byte_count]
+        return data
+
+    def flush(self) -> None:
+        # a host-side flush cannot reach the programmer, so any stream carries on
+        self.rxfifo.clear()
+        self.txfifo.clear()
+
+    def close(self) -> None:
+        return
+
+    def _process(self):
+        while self.rxfifo:
+            try:
+                command = OpenEEPROMCommands(self.rxfifo[0])
+            except ValueError:
+                del self.rxfifo[:1]
+                self._respond(OpenEEPROMResponseStatus.NAK)
+                continue
+
+            # any command other than a credit ends the stream, as stream_abort does
+            if command != OpenEEPROMCommands.STREAM_CREDIT:
+                self._end_stream()
+
+            # handlers return the number of parameter bytes consumed, or None
+            # if the rest of the command has not been received yet
+            consumed = self.handlers[command](bytes(self.rxfifo[1:]))
+            if consumed is None:
+                return
+            del self.rxfifo[:1 + consumed]
+
+    def _respond(self, status: int, payload: bytes=b''):
+        self.txfifo.append(status)
+        if status == OpenEEPROMResponseStatus.ACK:
+            self.txfifo.extend(payload)
+
+    def _nop(self, params: bytes) -> int:
+        self._respond(OpenEEPROMResponseStatus.ACK)
+        return 0
+
+    def _get_interface_version(self, params: bytes) -> int:
+        self._respond(OpenEEPROMResponseStatus.ACK, struct.pack('<H', INTERFACE_VERSION))
+        return 0
+
+    def _get_max_rx_size(self, params: bytes) -> int:
+        self._respond(OpenEEPROMResponseStatus.ACK, struct.pack('<I', self.max_rx_size))
+        return 0
+
+    def _get_max_tx_size(self, params: bytes) -> int:
+        self._respond(OpenEEPROMResponseStatus.ACK, struct.pack('<I', self.max_tx_size))
+        return 0
+
+    def _toggle_io(self, params: bytes) -> Optional[int]:
+        if len(params) < 1:
+            return None
+        self._respond(OpenEEPROMResponseStatus.ACK, params[:1])
+        return 1
+
+    def _get_supported_bus_types(self, params: bytes) -> int:
+        bus_types = OpenEEPROMBusTypes.PARALLEL | OpenEEPROMBusTypes.SPI | OpenEEPROMBusTypes.I2C
+        self._respond(OpenEEPROMResponseStatus.ACK, bytes([bus_types]))
+        return 0
+
+    def _set_address_bus_width(self, params: bytes) -> Optional[int]:
+        if len(params) < 1:
+            return None
+        self._respond(OpenEEPROMResponseStatus.ACK, bytes([min(params[0], self.max_address_bus_width)]))
+        return 1
+
+    def _echo_u32(self, params: bytes) -> Optional[int]:
+        if len(params) < 4:
+            return None
+        self._respond(OpenEEPROMResponseStatus.ACK, params[:4])
+        return 4
+
+    def _parallel_read(self, params: bytes) -> Optional[int]:
+        if len(params) < 8:
+            return None
+
+        address, count = struct.unpack_from('<II', params)
+        if count > self.max_tx_size - 1:
+            self._respond(OpenEEPROMResponseStatus.NAK)
+        else:
+            data = bytes(self.parallel_device.read(address + i) for i in range(count))
+            self._respond(OpenEEPROMResponseStatus.ACK, data)
+        return 8
+
+    def _parallel_write(self, params: bytes) -> Optional[int]:
+        if len(params) < 8:
+            return None
+
+        address, count = struct.unpack_from('<II', params)
+        if len(params) < 8 + count:
+            return None
+
+        if 9 + count > self.max_rx_size:
+            self._respond(OpenEEPROMResponseStatus.NAK)
+        else:
+            for i, byte in enumerate(params[8:8 + count]):
+                self.parallel_device.write(address + i, byte)
+            self._respond(OpenEEPROMResponseStatus.ACK)
+        return 8 + count
+
+    def _set_spi_mode(self, params: bytes) -> Optional[int]:
+        if len(params) < 1:
+            return None
+
+        if params[0] > 3:
+            self._respond(OpenEEPROMResponseStatus.NAK)
+        else:
+            self._respond(OpenEEPROMResponseStatus.ACK, params[:1])
+        return 1
+
+    def _get_supported_spi_modes(self, params: bytes) -> int:
+        self._respond(OpenEEPROMResponseStatus.ACK, bytes([0x0F]))
+        return 0
+
+    def _spi_transmit(self, params: bytes) -> Optional[int]:
+        if len(params) < 4:
+            return None
+
+        count = struct.unpack_from('<I', params)[0]
+        if len(params) < 4 + count:
+            return None
+
+        if 5 + count > self.max_rx_size or count > self.max_tx_size - 1:
+            self._respond(OpenEEPROMResponseStatus.NAK)
+        else:
+            self._respond(OpenEEPROMResponseStatus.ACK, self._spi_exchange(params[4:4 + count]))
+        return 4 + count
+
+    def _spi_exchange(self, data: bytes) -> bytes:
+        if self.spi_device is None:
+            return bytes(len(data))
+
+        if not self.spi_selected:
+            self.spi_device.select()
+            self.spi_selected = True
+        result = bytes(self.spi_device.transfer(byte) for byte in data)
+        if not self.spi_cs_hold:
+            self.spi_device.deselect()
+            self.spi_selected = False
+        return result
+
+    def _set_spi_cs_hold(self, params: bytes) -> Optional[int]:
+        if len(params) < 1:
+            return None
+
+        self.spi_cs_hold = params[0] != 0
+        if not self.spi_cs_hold and self.spi_selected:
+            self.spi_device.deselect()  # releasing the hold ends the transaction
+            self.spi_selected = False
+        self._respond(OpenEEPROMResponseStatus.ACK, bytes([self.spi_cs_hold]))
+        return 1
+
+    def _i2c_transfer(self, params: bytes) -> Optional[int]:
+        if len(params) < 9:
+            return None
+
+        address = params[0]
+        write_count, read_count = struct.unpack_from('<II', params, 1)
+        if len(params) < 9 + write_count:
+            return None
+
+        result = None
+        if 10 + write_count <= self.max_rx_size and read_count <= self.max_tx_size - 1:
+            for device in self.i2c_devices:
+                result = device.transfer(address, params[9:9 + write_count], read_count)
+                if result is not None:
+                    break
+
+        if result is None:
+            self._respond(OpenEEPROMResponseStatus.NAK)
+        else:
+            self._respond(OpenEEPROMResponseStatus.ACK, result)
+        return 9 + write_count
+
+    def _i2c_poll(self, params: bytes) -> Optional[int]:
+        if len(params) < 1:
+            return None
+
+        acked = any(device.poll(params[0]) for device in self.i2c_devices)
+        self._respond(OpenEEPROMResponseStatus.ACK, bytes([acked]))
+        return 1
+
+    def _parallel_write_compressed(self, params: bytes) -> Optional[int]:
+        if len(params) < 12:
+            return None
+
+        address, count, length = struct.unpack_from('<III', params)
+        if len(params) < 12 + length:
+            return None
+
+        data = packbits_decode(params[12:12 + length])
+        if 13 + length > self.max_rx_size or count > self.max_rx_size - 9 or len(data) != count:
+            self._respond(OpenEEPROMResponseStatus.NAK)
+        else:
+            for i, byte in enumerate(data):
+                self.parallel_device.write(address + i, byte)
+            self._respond(OpenEEPROMResponseStatus.ACK)
+        return 12 + length
+
+    def _spi_transmit_compressed(self, params: bytes) -> Optional[int]:
+        if len(params) < 8:
+            return None
+
+        count, length = struct.unpack_from('<II', params)
+        if len(params) < 8 + length:
+            return None
+
+        data = packbits_decode(params[8:8 + length])
+        if 9 + length > self.max_rx_size or count > self.max_tx_size - 2 or len(data) != count:
+            self._respond(OpenEEPROMResponseStatus.NAK)
+        else:
+            self._respond(OpenEEPROMResponseStatus.ACK, self._frame(self._spi_exchange(data)))
+        return 8 + length
+
+    def _parallel_stream_read(self, params: bytes, compressed: bool=False) -> Optional[int]:
+        if len(params) < 10:
+            return None
+
+        address, count, credits = struct.unpack_from('<IIH', params)
+        self._respond(OpenEEPROMResponseStatus.ACK)
+        self._start_stream(bytes(self.parallel_device.read(address + i) for i in range(count)), credits, compressed)
+        return 10
+
+    def _spi_stream_read(self, params: bytes, compressed: bool=False) -> Optional[int]:
+        if len(params) < 10:
+            return None
+
+        header_count, count, credits = struct.unpack_from('<IIH', params)
+        if len(params) < 10 + header_count:
+            return None
+
+        if 11 + header_count > self.max_rx_size:
+            self._respond(OpenEEPROMResponseStatus.NAK)
+        else:
+            # the responses to the header bytes are discarded
+            data = self._spi_exchange(params[10:10 + header_count] + bytes(count))
+            self._respond(OpenEEPROMResponseStatus.ACK)
+            self._start_stream(data[header_count:], credits, compressed)
+        return 10 + header_count
+
+    def _stream_credit(self, params: bytes) -> Optional[int]:
+        if len(params) < 2:
+            return None
+
+        # credits have no response since they arrive while the stream is being sent
+        self.stream_credits += struct.unpack_from('<H', params)[0]
+        self._release_stream()
+        return 2
+
+    def _stream_abort(self, params: bytes) -> int:
+        # the blocks already credited have been sent, so only the ACK is left
+        self._respond(OpenEEPROMResponseStatus.ACK)
+        return 0
+
+    def _end_stream(self):
+        self.stream.clear()
+        self.stream_credits = 0
+
+    def _start_stream(self, data: bytes, credits: int, compressed: bool):
+        if compressed:
+            block_size = self.max_tx_size - 1
+            self.stream = [self._frame(data[i:i + block_size]) for i in range(0, len(data), block_size)]
+        else:
+            self.stream = [data[i:i + self.max_tx_size] for i in range(0, len(data), self.max_tx_size)]
+        self.stream_credits = credits
+        self._release_stream()
+
+    def _release_stream(self):
+        while self.stream and self.stream_credits > 0:
+            self.txfifo.extend(self.stream.pop(0))
+            self.stream_credits -= 1
+
+        if not self.stream:
+            self.stream_credits = 0
+
+    def _frame(self, data: bytes) -> bytes:
+        encoded = packbits_encode(data)
+        if len(encoded) + 2 < len(data) and len(encoded) <= 0xFFFF:
+            return struct.pack('<BH', OpenEEPROMEncodings.PACKBITS, len(encoded)) + encoded
+        return bytes([OpenEEPROMEncodings.RAW]) + data
@@ -0,0 +1,58 @@
+import pytest
+import random
+from unittest import mock
+
+from openeeprom.chip.at24cxx import AT24C02, AT24C16, AT24C512
+from openeeprom.client import OpenEEPROMClient
+from openeeprom.transport.emulator import EmulatorTransport, EmulatedI2CEEPROM
+
+
+def connect(chip, page_size, address_bytes, max_rx_size=64, max_tx_size=256):
+    device = EmulatedI2CEEPROM(chip.size, page_size, address_bytes)
+    transport = EmulatorTransport(max_rx_size=max_rx_size, max_tx_size=max_tx_size, i2c_devices=[device])
+    chip.connect(OpenEEPROMClient(transport))
+    return device
+
+
+class TestAT24Cxx:
+    @pytest.mark.parametrize('chip, page_size, address_bytes', [
+        (AT24C02(), 8, 1),
+        (AT24C16(), 16, 1),
+        (AT24C512(), 128, 2),
+    ])
+    def test_write_read(self, chip, page_size, address_bytes):
+        device = connect(chip, page_size, address_bytes)
+        write_vals = [random.randint(0, 255) for i in range(chip.size)]
+
+        assert chip.write(0, write_vals) == chip.size
+        assert bytes(device.memory) == bytes(write_vals)
+        assert chip.read(0, chip.size) == write_vals
+
+    def test_unaligned_write(self):
+        chip = AT24C16()
+        device = connect(chip, 16, 1)
+        chip.write(250, [1] * 20)
+        assert device.memory[249:271] == bytes([0xFF] + [1] * 20 + [0xFF])
+        assert chip.read(250, 20) == [1] * 20
+
+    def test_sequential_read_transactions(self):
+        chip = AT24C512()
+        device = connect(chip, 128, 2, max_tx_size=16385)
+        device.memory[:] = bytes(range(256)) * 256
+
+        with mock.patch.object(chip.client, 'i2c_transfer', wraps=chip.client.i2c_transfer) as i2c_transfer:
+            assert chip.read(0, chip.size) == list(device.memory)
+        assert i2c_transfer.call_count == 4
+
+    def test_erase(self):
+        chip = AT24C02()
+        device = connect(chip, 8, 1)
+        device.memory[:] = bytes(chip.size)
+        chip.erase()
+        assert chip.read(0, chip.size) == [0xFF] * chip.size
+
+    def test_address_out_of_range(self):
+        chip = AT24C02()
+        connect(chip, 8, 1)
+        with pytest.raises(ValueError):
+            chip.read(200, 100)
@@ -0,0 +1,133 @@
+import json
+import pytest
+from unittest import mock
+
+from openeeprom.batch import load_batch, plan_batch, run_batch, step_dependencies
+from openeeprom.chip.at28c256 import AT28C256
+from openeeprom.chip.microchip25lc320 import MC25LC320
+from openeeprom.jobs import Programmer, OpenEEPROMJobFailedException
+from openeeprom.transport.emulator import EmulatorTransport, EmulatedSPIEEPROM
+
+
+DEVICES = {'25LC320': MC25LC320(), 'AT28C256': AT28C256()}
+
+BATCH = {'programmers': {'station1': {'serial': '/dev/ttyACM0:115200'}},
+         'steps': [{'chip': '25LC320', 'command': 'read', 'count': 16}]}
+
+
+def make_programmer(name):
+    transport = EmulatorTransport(spi_device=EmulatedSPIEEPROM(4096, 32))
+    transport.send = mock.Mock(wraps=transport.send)
+    return Programmer(name, transport, DEVICES)
+
+
+@pytest.fixture
+def programmers():
+    programmers = {name: make_programmer(name) for name in ('station1', 'station2')}
+    yield programmers
+    for programmer in programmers.values():
+        programmer.close()
+
+
+def steps_for(*chips, programmer='station1'):
+    return [{'name': str(idx), 'programmer': programmer, 'chip': chip} for idx, chip in enumerate(chips)]
+
+
+class TestBatch:
+    def test_plan_groups_chips(self):
+        steps = steps_for('25LC320', 'AT28C256', '25LC320', 'AT28C256')
+        assert plan_batch(steps, step_dependencies(steps)) == [0, 2, 1, 3]
+
+    def test_plan_keeps_file_order(self):
+        steps = steps_for('25LC320', 'AT28C256', '25LC320')
+        steps[0].update(command='read', file='id.bin')
+        steps[1].update(command='write', file='id.bin')
+        assert step_dependencies(steps) == [set(), {0}, {0}]
+        assert plan_batch(steps, step_dependencies(steps)) == [0, 2, 1]
+
+        steps[2]['after'] = ['1']
+        assert plan_batch(steps, step_dependencies(steps)) == [0, 1, 2]
+
+    def test_after_unknown_step(self):
+        steps = steps_for('25LC320', '25LC320')
+        steps[0]['after'] = ['1']
+        with pytest.raises(OpenEEPROMJobFailedException):
+            step_dependencies(steps)
+
+    def test_duplicate_name(self, programmers):
+        steps = [{'programmer': 'station1', 'chip': '25LC320', 'command': 'read'} for _ in range(3)]
+        steps[0]['name'] = '2'  # the third step is named '2' by default
+        with pytest.raises(OpenEEPROMJobFailedException):
+            run_batch(steps, programmers)
+
+    def test_run(self, tmp_path, programmers):
+        (tmp_path / 'image.bin').write_bytes(bytes(range(256)))
+        steps = [
+            {'programmer': 'station1', 'chip': '25LC320', 'command': 'write', 'file': 'image.bin'},
+            {'programmer': 'station1', 'chip': 'AT28C256', 'command': 'write', 'offset': 16, 'file': 'image.bin'},
+            {'programmer': 'station1', 'chip': '25LC320', 'command': 'verify', 'file': 'image.bin'},
+            {'programmer': 'station1', 'chip': 'AT28C256', 'command': 'read', 'offset': 16, 'count': 256, 'file': 'copy.bin'},
+            {'programmer': 'station2', 'chip': '25LC320', 'command': 'write', 'file': 'copy.bin'},
+        ]
+        report = run_batch(steps, programmers, str(tmp_path))
+
+        assert report['status'] == 'ok'
+        assert report['order'] == ['0', '2', '1', '3', '4']
+        assert report['chip_changes'] == {'station1': 1, 'station2': 0}
+        assert report['steps'][2]['result']['mismatches'] == []
+        assert all(step['duration'] >= 0 for step in report['steps'])
+        assert report['steps'][4]['start'] >= report['steps'][3]['start'] + report['steps'][3]['duration']
+        assert bytes(programmers['station2'].client.io.spi_device.memory[:256]) == bytes(range(256))
+
+    def test_connections_reused(self, tmp_path, programmers):
+        (tmp_path / 'image.bin').write_bytes(bytes(64))
+        steps = [{'chip': 'AT28C256', 'programmer': 'station1', 'command': 'write', 'file': 'image.bin', 'offset': 64 * i}
+                 for i in range(4)]
+        run_batch(steps, programmers, str(tmp_path))
+        # the bus is only configured for the first step
+        sent = programmers['station1'].client.io.send.call_args_list
+        assert sum(call.args[0][0] == 0x07 for call in sent) == 1
+
+    def test_failed_step_skips_dependents(self, tmp_path, programmers):
+        (tmp_path / 'image.bin').write_bytes(bytes(16))
+        steps = [
+            {'name': 'write', 'programmer': 'station1', 'chip': '25LC320', 'command': 'write', 'file': 'missing.bin'},
+            {'name': 'verify', 'programmer': 'station1', 'chip': '25LC320', 'command': 'verify', 'file': 'missing.bin'},
+            {'name': 'other', 'programmer': 'station1', 'chip': 'AT28C256', 'command': 'write', 'file': 'image.bin'},
+        ]
+        report = run_batch(steps, programmers, str(tmp_path))
+        assert report['status'] == 'error'
+        assert [step['status'] for step in report['steps']] == ['error', 'skipped', 'ok']
+
+    def test_verify_mismatch_skips_dependents(self, tmp_path, programmers):
+        (tmp_path / 'image.bin').write_bytes(bytes(range(16)))
+        steps = [
+            {'name': 'verify', 'programmer': 'station1', 'chip': '25LC320', 'command': 'verify', 'file': 'image.bin'},
+            {'name': 'copy', 'programmer': 'station2', 'chip': '25LC320', 'command': 'write', 'file': 'image.bin',
+             'after': ['verify']},
+        ]
+        report = run_batch(steps, programmers, str(tmp_path))
+        assert report['status'] == 'error'
+        assert [step['status'] for step in report['steps']] == ['mismatch', 'skipped']
+        assert report['steps'][0]['result']['mismatches'][0] == [0, 0, 0xFF]  # the chip is erased
+
+    def test_unknown_chip(self, programmers):
+        with pytest.raises(OpenEEPROMJobFailedException):
+            run_batch([{'programmer': 'station1', 'chip': 'NONE', 'command': 'read'}], programmers)
+
+    def test_load(self, tmp_path):
+        (tmp_path / 'jobs.json').write_text(json.dumps(BATCH))
+        assert load_batch(str(tmp_path / 'jobs.json')) == BATCH
+
+    def test_load_toml(self, tmp_path):
+        pytest.importorskip('tomllib')
+        (tmp_path / 'jobs.toml').write_text('''
+[programmers.station1]
+serial = "/dev/ttyACM0:115200"
+
+[[steps]]
+chip = "25LC320"
+command = "read"
+count = 16
+''')
+        assert load_batch(str(tmp_path / 'jobs.toml')) == BATCH
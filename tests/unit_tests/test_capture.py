@@ -0,0 +1,91 @@
+import pytest
+
+from openeeprom.chip.microchip25lc320 import MC25LC320
+from openeeprom.client import OpenEEPROMClient
+from openeeprom.transport.capture import RecordingTransport, ReplayTransport, ReplayMismatchException, \
+        read_capture, decode_capture, CaptureEvents
+from openeeprom.transport.emulator import EmulatorTransport, EmulatedSPIEEPROM, EmulatedParallelMemory
+
+
+@pytest.fixture
+def capture(tmp_path):
+    path = str(tmp_path / 'capture.bin')
+    spi_device = EmulatedSPIEEPROM(4096, 32)
+    spi_device.memory[:] = bytes(range(256)) * 16
+
+    transport = RecordingTransport(EmulatorTransport(max_rx_size=64, max_tx_size=64, spi_device=spi_device), path)
+    chip = MC25LC320()
+    chip.connect(OpenEEPROMClient(transport))
+    chip.read(0, 1000)
+    chip.write(0, [1, 2, 3, 4])
+    transport.close()
+    return path
+
+
+def run_chip(transport):
+    chip = MC25LC320()
+    chip.connect(OpenEEPROMClient(transport))
+    data = chip.read(0, 1000)
+    chip.write(0, [1, 2, 3, 4])
+    return data
+
+
+class TestCapture:
+    def test_read_capture(self, capture):
+        records = read_capture(capture)
+        assert records[0][0] == CaptureEvents.FLUSH
+        assert [timestamp for _, timestamp, _ in records] == sorted(timestamp for _, timestamp, _ in records)
+
+    def test_replay(self, capture):
+        assert run_chip(ReplayTransport(capture)) == list(bytes(range(256)) * 4)[:1000]
+
+    def test_replay_timing(self, capture):
+        assert run_chip(ReplayTransport(capture, timing=True)) == list(bytes(range(256)) * 4)[:1000]
+
+    def test_replay_mismatch(self, capture):
+        transport = ReplayTransport(capture)
+        chip = MC25LC320()
+        chip.connect(OpenEEPROMClient(transport))
+        with pytest.raises(ReplayMismatchException):
+            chip.read(8, 1000)
+
+    def test_replay_past_end(self, capture):
+        transport = ReplayTransport(capture, strict=False)
+        run_chip(transport)
+        with pytest.raises(ReplayMismatchException, match='Capture ended'):
+            run_chip(transport)
+
+    def test_decode(self, capture):
+        lines = decode_capture(capture)
+        assert 'SYNC -> ACK' in lines[0]
+        assert 'GET_MAX_RX_SIZE -> ACK 64' in lines[1]
+        assert any('SPI_STREAM_READ_COMPRESSED header_count=3 count=1000 credits=8 -> ACK <1000 bytes as' in line for line in lines)
+        assert any('STREAM_CREDIT credits=1' in line for line in lines)
+        assert 'SPI_TRANSMIT count=7 -> ACK <7 bytes>' in lines[-1]
+
+    @pytest.mark.parametrize('compression', [False, True])
+    def test_decode_abandoned_stream(self, tmp_path, compression):
+        class FailingSink:
+            def __init__(self):
+                self.writes = 0
+
+            def write(self, data):
+                self.writes += 1
+                if self.writes == 3:
+                    raise OSError('disk full')
+
+        path = str(tmp_path / 'capture.bin')
+        parallel_device = EmulatedParallelMemory(2**16)
+        parallel_device.memory[:] = bytes(range(256)) * 256
+        transport = RecordingTransport(EmulatorTransport(parallel_device=parallel_device), path)
+        client = OpenEEPROMClient(transport)
+        client.compression = compression
+        with pytest.raises(OSError):
+            client.parallel_stream_read(0, 4096, FailingSink())
+        client.parallel_read(10, 4)
+        transport.close()
+
+        lines = decode_capture(path)
+        assert any('STREAM_READ' in line and ', aborted' in line for line in lines)
+        assert any('STREAM_ABORT -> ACK' in line for line in lines)
+        assert 'PARALLEL_READ address=0xA count=4 -> ACK <4 bytes>' in lines[-1]
@@ -0,0 +1,21 @@
+import pytest
+
+from openeeprom.compression import packbits_encode, packbits_decode
+
+
+class TestCompression:
+    @pytest.mark.parametrize('data', [
+        b'',
+        b'a',
+        b'ab',
+        b'aaa',
+        bytes(1000),
+        bytes(range(256)) * 3,
+        b'ab' + b'c' * 130 + b'de' + b'f' * 2 + b'g' * 3,
+    ])
+    def test_round_trip(self, data):
+        assert packbits_decode(packbits_encode(data)) == data
+
+    def test_encoding(self):
+        assert packbits_encode(b'\xaa' * 10 + b'\x01\x02') == bytes([247, 0xAA, 1, 1, 2])
+        assert len(packbits_encode(bytes(range(256)))) == 258
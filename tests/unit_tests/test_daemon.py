@@ -0,0 +1,140 @@
+import base64
+import os
+import pytest
+import socket
+import threading
+from typing import List
+from unittest import mock
+
+from openeeprom.chip.basechip import BaseChip
+from openeeprom.client import OpenEEPROMClient, OpenEEPROMCommands
+from openeeprom.daemon import OpenEEPROMDaemon, OpenEEPROMDaemonClient
+from openeeprom.jobs import Programmer, OpenEEPROMJobFailedException
+from openeeprom.transport.dummy import DummyTransport
+
+
+class MemoryChip(BaseChip):
+    def __init__(self):
+        super().__init__('memory', 256)
+        self.memory = [0xFF] * self.size
+        self.connect_count = 0
+
+    def connect(self, client: OpenEEPROMClient):
+        self.client = client
+        self.connect_count += 1
+
+    def disconnect(self):
+        self.client = None
+
+    def read(self, address: int, byte_count: int) -> List[int]:
+        return self.memory[address:address + byte_count]
+
+    def write(self, address: int, byte_list: List[int]) -> int:
+        self.memory[address:address + len(byte_list)] = byte_list
+        return len(byte_list)
+
+    def erase(self) -> None:
+        self.memory = [0xFF] * self.size
+
+
+@pytest.fixture
+def programmer():
+    return Programmer('station', DummyTransport(), {'MEMORY': MemoryChip()})
+
+
+@pytest.fixture
+def daemon_client(tmp_path, programmer):
+    socket_path = str(tmp_path / 'openeeprom.sock')
+    server = OpenEEPROMDaemon(socket_path, {'station': programmer})
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    client = OpenEEPROMDaemonClient(socket_path)
+    yield client
+
+    client.close()
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestDaemon:
+    def test_write_read_verify(self, daemon_client):
+        data = base64.b64encode(bytes([1, 2, 3, 4])).decode('ascii')
+        result = daemon_client.submit({'chip': 'MEMORY', 'command': 'write', 'offset': 8, 'data': data})
+        assert result['count'] == 4
+
+        result = daemon_client.submit({'programmer': 'station', 'chip': 'MEMORY', 'command': 'read', 'offset': 8, 'count': 4})
+        assert base64.b64decode(result['data']) == bytes([1, 2, 3, 4])
+
+        data = base64.b64encode(bytes([1, 2, 0, 4])).decode('ascii')
+        result = daemon_client.submit({'chip': 'MEMORY', 'command': 'verify', 'offset': 8, 'data': data})
+        assert result['mismatches'] == [[10, 0, 3]]
+
+    def test_read_to_file(self, daemon_client, tmp_path):
+        path = tmp_path / 'out.bin'
+        result = daemon_client.submit({'chip': 'MEMORY', 'command': 'read', 'file': str(path)})
+        assert result['count'] == 256
+        assert path.read_bytes() == bytes([0xFF] * 256)
+
+    def test_errors(self, daemon_client):
+        with pytest.raises(OpenEEPROMJobFailedException):
+            daemon_client.submit({'chip': 'UNKNOWN', 'command': 'read'})
+        with pytest.raises(OpenEEPROMJobFailedException):
+            daemon_client.submit({'programmer': 'other', 'chip': 'MEMORY', 'command': 'read'})
+        with pytest.raises(OpenEEPROMJobFailedException):
+            daemon_client.submit({'chip': 'MEMORY', 'command': 'write'})
+
+    def test_failure_resets_config(self, programmer):
+        chip = programmer.get_chip('MEMORY')
+        programmer.client._config[OpenEEPROMCommands.SET_SPI_MODE] = 0
+        chip.read = mock.Mock(side_effect=OSError('link lost'))
+        with mock.patch.object(programmer.client, 'sync', side_effect=IndexError) as sync:
+            with pytest.raises(OSError):
+                programmer.run({'chip': 'MEMORY', 'command': 'read'})
+        assert sync.called
+        assert programmer.client._config == {}
+
+    def test_chip_reused(self, daemon_client, programmer):
+        daemon_client.submit({'chip': 'MEMORY', 'command': 'erase'})
+        daemon_client.submit({'chip': 'MEMORY', 'command': 'erase'})
+        assert programmer.chips['MEMORY'].connect_count == 2
+        assert programmer.devices['MEMORY'].connect_count == 0
+
+
+class TestDaemonSocket:
+    def test_existing_file(self, tmp_path, programmer):
+        path = tmp_path / 'jobs.json'
+        path.write_text('{}')
+        with pytest.raises(FileExistsError):
+            OpenEEPROMDaemon(str(path), {'station': programmer})
+        assert path.read_text() == '{}'
+
+    def test_running_daemon(self, tmp_path, programmer):
+        socket_path = str(tmp_path / 'openeeprom.sock')
+        server = OpenEEPROMDaemon(socket_path, {'station': programmer})
+        with pytest.raises(FileExistsError):
+            OpenEEPROMDaemon(socket_path, {})
+        server.server_close()
+        assert not os.path.exists(socket_path)
+
+    def test_stale_socket(self, tmp_path, programmer):
+        socket_path = str(tmp_path / 'openeeprom.sock')
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()  # the path stays behind without a listener
+
+        server = OpenEEPROMDaemon(socket_path, {'station': programmer})
+        server.server_close()
+        assert not os.path.exists(socket_path)
+
+    def test_close_keeps_replaced_socket(self, tmp_path, programmer):
+        socket_path = str(tmp_path / 'openeeprom.sock')
+        server = OpenEEPROMDaemon(socket_path, {'station': programmer})
+        os.rename(socket_path, str(tmp_path / 'moved.sock'))  # keeps the inode in use
+        other = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        other.bind(socket_path)
+
+        server.server_close()
+        assert os.path.exists(socket_path)
+        other.close()
@@ -0,0 +1,46 @@
+import pytest
+import random
+from unittest import mock
+
+from openeeprom.chip.microchip25lc320 import MC25LC320
+from openeeprom.client import OpenEEPROMClient
+from openeeprom.transport.emulator import EmulatorTransport, EmulatedSPIEEPROM
+
+
+@pytest.fixture
+def chip():
+    chip = MC25LC320()
+    transport = EmulatorTransport(max_rx_size=64, max_tx_size=64, spi_device=EmulatedSPIEEPROM(chip.size, 32))
+    chip.connect(OpenEEPROMClient(transport))
+    return chip
+
+
+class TestMC25LC320:
+    def test_write_read(self, chip):
+        write_vals = [random.randint(0, 255) for i in range(chip.size)]
+        assert chip.write(0, write_vals) == chip.size
+        assert bytes(chip.client.io.spi_device.memory) == bytes(write_vals)
+        assert chip.read(0, chip.size) == write_vals
+
+    def test_chunked_read(self, chip):
+        chip.client.interface_version = 0x0100
+        chip.client.io.spi_device.memory[:] = bytes(range(256)) * 16
+        assert chip.read(10, 1000) == list(chip.client.io.spi_device.memory[10:1010])
+
+    def test_sequential_read(self, chip):
+        chip.client.streaming = False
+        chip.client.io.spi_device.memory[:] = bytes(range(256)) * 16
+        with mock.patch.object(chip.client.io, 'send', wraps=chip.client.io.send) as send:
+            assert chip.read(10, 1000) == list(chip.client.io.spi_device.memory[10:1010])
+        # one READ command for the whole range
+        assert sum(call.args[0].endswith(bytes([0x03, 0x00, 0x0A])) for call in send.call_args_list) == 1
+        assert not chip.client.io.spi_selected
+
+    def test_write_page_across_transmits(self):
+        chip = MC25LC320()
+        transport = EmulatorTransport(max_rx_size=24, max_tx_size=24, spi_device=EmulatedSPIEEPROM(chip.size, 32))
+        chip.connect(OpenEEPROMClient(transport))
+        write_vals = [random.randint(0, 255) for i in range(100)]
+        chip.write(20, write_vals)
+        assert bytes(transport.spi_device.memory[20:120]) == bytes(write_vals)
+        assert chip.read(20, 100) == write_vals
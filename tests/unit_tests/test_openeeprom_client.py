@@ -1,8 +1,12 @@
+import io
 import pytest
+import random
 import struct
+from unittest import mock
 
-from openeeprom.client import OpenEEPROMClient, OpenEEPROMCommands
+from openeeprom.client import OpenEEPROMClient, OpenEEPROMCommands, OpenEEPROMCommandFailedException
 from openeeprom.transport.dummy import DummyTransport
+from openeeprom.transport.emulator import EmulatorTransport, EmulatedParallelMemory, EmulatedSPIEEPROM
 
 
 @pytest.fixture
@@ -13,9 +17,21 @@ def dummy_client():
     client.max_par_read_count = 1024
     client.max_par_write_count = 1024
     client.max_spi_transmit_count = 1024
+    client.max_i2c_write_count = 1024
+    client.max_i2c_read_count = 1024
     return client
 
 
+@pytest.fixture
+def emulator_client():
+    transport = EmulatorTransport(max_rx_size=64, max_tx_size=64,
+                                  parallel_device=EmulatedParallelMemory(4096),
+                                  spi_device=EmulatedSPIEEPROM(4096, 32))
+    transport.parallel_device.memory[:] = bytes(range(256)) * 16
+    transport.spi_device.memory[:] = bytes(reversed(range(256))) * 16
+    return OpenEEPROMClient(transport)
+
+
 class TestOpenEEPROMClient:
     def test_nop(self, dummy_client):
         dummy_client.nop()
@@ -117,3 +133,161 @@ class TestOpenEEPROMClient:
             write_list = [0] * dummy_client.max_spi_transmit_count + 1
             dummy_client.spi_transmit(write_list) 
 
+
+    def test_cache_config(self, dummy_client):
+        dummy_client.cache_config = True
+        dummy_client.set_address_bus_width(5)
+        dummy_client.get_supported_bus_types()
+        dummy_client.nop()
+
+        dummy_client.set_address_bus_width(5)
+        dummy_client.get_supported_bus_types()
+        assert dummy_client.io.txfifo == bytes([OpenEEPROMCommands.NOP.value])
+
+        dummy_client.invalidate_config()
+        dummy_client.get_supported_bus_types()
+        assert dummy_client.io.txfifo == bytes([OpenEEPROMCommands.GET_SUPPORTED_BUS_TYPES.value])
+
+    def test_no_cache_config(self, dummy_client):
+        dummy_client.set_address_bus_width(5)
+        dummy_client.nop()
+        dummy_client.set_address_bus_width(5)
+        assert dummy_client.io.txfifo[0:1] == bytes([OpenEEPROMCommands.SET_ADDRESS_BUS_WIDTH.value])
+
+    def test_set_i2c_clock_freq(self, dummy_client):
+        with pytest.raises(Exception):
+            dummy_client.set_i2c_clock_freq(0xabcdef01)
+        assert dummy_client.io.txfifo[0:1] == bytes([OpenEEPROMCommands.SET_I2C_CLOCK_FREQUENCY.value])
+        assert dummy_client.io.txfifo[1:5] == b'\x01\xef\xcd\xab'
+
+    def test_i2c_transfer(self, dummy_client):
+        write_list = [1, 2, 3, 4]
+        result = dummy_client.i2c_transfer(0x50, write_list, 16)
+        assert len(result) == 16
+        assert dummy_client.io.txfifo[0:2] == bytes([OpenEEPROMCommands.I2C_TRANSFER.value, 0x50])
+        assert dummy_client.io.txfifo[2:6] == struct.pack('<I', len(write_list))
+        assert dummy_client.io.txfifo[6:10] == struct.pack('<I', 16)
+        assert dummy_client.io.txfifo[10:14] == struct.pack('BBBB', *write_list)
+
+    def test_i2c_transfer_exceed_length(self, dummy_client):
+        with pytest.raises(Exception):
+            dummy_client.i2c_transfer(0x50, [0] * (dummy_client.max_i2c_write_count + 1))
+        with pytest.raises(Exception):
+            dummy_client.i2c_transfer(0x50, [], dummy_client.max_i2c_read_count + 1)
+
+    def test_i2c_poll(self, dummy_client):
+        dummy_client.i2c_poll(0x50)
+        assert dummy_client.io.txfifo == bytes([OpenEEPROMCommands.I2C_POLL.value, 0x50])
+
+    def test_stream_read_unsupported(self, dummy_client):
+        with pytest.raises(Exception):
+            dummy_client.parallel_stream_read(0, 64)
+
+
+class TestOpenEEPROMClientEmulator:
+    def test_parallel_stream_read(self, emulator_client):
+        result = emulator_client.parallel_stream_read(100, 3000)
+        assert result == list(emulator_client.io.parallel_device.memory[100:3100])
+        assert emulator_client.io.txfifo == b''
+
+    def test_spi_stream_read(self, emulator_client):
+        result = emulator_client.spi_stream_read([0x03, 0x00, 0x10], 2000)
+        assert result == list(emulator_client.io.spi_device.memory[0x10:0x10 + 2000])
+
+    @pytest.mark.parametrize('compression', [False, True])
+    def test_abandoned_stream(self, emulator_client, compression):
+        class FailingSink:
+            def __init__(self):
+                self.writes = 0
+
+            def write(self, data):
+                self.writes += 1
+                if self.writes == 3:
+                    raise OSError('disk full')
+
+        emulator_client.compression = compression
+        with pytest.raises(OSError):
+            emulator_client.parallel_stream_read(0, 4096, FailingSink())
+        assert emulator_client.io.txfifo == b''
+        assert emulator_client.io.stream == []
+
+        # the link is back in step without a sync
+        assert emulator_client.parallel_read(10, 20) == list(emulator_client.io.parallel_device.memory[10:30])
+
+    def test_command_ends_stream(self, emulator_client):
+        emulator_client.io.send(bytes([OpenEEPROMCommands.PARALLEL_STREAM_READ.value]) + struct.pack('<IIH', 0, 4096, 1))
+        emulator_client.io.flush()
+        assert emulator_client.io.stream != []  # a host-side flush does not end the stream
+
+        emulator_client.sync()
+        assert emulator_client.io.stream == []
+        assert emulator_client.parallel_read(0, 4) == list(emulator_client.io.parallel_device.memory[:4])
+
+    def test_spi_transaction(self, emulator_client):
+        with emulator_client.spi_transaction():
+            emulator_client.spi_transmit([0x03, 0x00])
+            emulator_client.spi_transmit([0x20])
+            assert emulator_client.io.spi_selected
+            result = emulator_client.spi_transmit([0] * 50)
+        assert not emulator_client.io.spi_selected
+        assert result == list(emulator_client.io.spi_device.memory[0x20:0x20 + 50])
+
+        # without the hold every transmit is a separate transaction
+        emulator_client.spi_transmit([0x03, 0x00])
+        assert emulator_client.spi_transmit([0] * 4) == [0xFF] * 4
+
+    def test_stream_read_uncompressed(self, emulator_client):
+        emulator_client.compression = False
+        emulator_client.io.parallel_device.memory[:] = bytes(4096)
+        assert emulator_client.parallel_stream_read(0, 4096) == [0] * 4096
+
+    def test_compressed_stream_read(self, emulator_client):
+        emulator_client.io.parallel_device.memory[:] = bytes(4096)
+        with mock.patch.object(emulator_client.io, 'receive', wraps=emulator_client.io.receive) as receive:
+            assert emulator_client.parallel_stream_read(0, 4096) == [0] * 4096
+        assert sum(call.args[0] for call in receive.call_args_list) < 1024
+
+    def test_incompressible_stream_read(self, emulator_client):
+        data = random.Random(1).randbytes(4096)
+        emulator_client.io.parallel_device.memory[:] = data
+
+        def wire_bytes(compression):
+            emulator_client.compression = compression
+            with mock.patch.object(emulator_client.io, 'receive', wraps=emulator_client.io.receive) as receive:
+                assert emulator_client.parallel_stream_read(0, 4096) == list(data)
+            return sum(call.args[0] for call in receive.call_args_list)
+
+        raw = wire_bytes(False)
+        # only the encoding byte of each frame is added
+        assert raw <= wire_bytes(True) <= raw * 1.02
+
+    @pytest.mark.parametrize('compression', [False, True])
+    def test_stream_read_short_receives(self, emulator_client, compression):
+        emulator_client.compression = compression
+        receive = emulator_client.io.receive
+        emulator_client.io.receive = lambda count: receive(min(count, 7))
+        assert emulator_client.parallel_stream_read(0, 4096) == list(emulator_client.io.parallel_device.memory)
+
+    def test_stream_read_empty_receive(self, emulator_client):
+        emulator_client.compression = True
+        emulator_client.parallel_stream_read(0, 1)  # read the programmer configuration first
+        receive = emulator_client.io.receive
+        emulator_client.io.receive = lambda count: receive(count) if count == 1 else b''
+        with pytest.raises(OpenEEPROMCommandFailedException):
+            emulator_client.parallel_stream_read(0, 4096)
+
+    def test_compressed_parallel_write(self, emulator_client):
+        emulator_client.parallel_write(0, [0xAB] * 50)
+        assert emulator_client.io.parallel_device.memory[:51] == bytes([0xAB] * 50) + bytes([50])
+
+    def test_spi_transmit_compressed(self, emulator_client):
+        result = emulator_client.spi_transmit([0x03, 0x00, 0x00] + [0] * 40)
+        assert result[3:] == list(emulator_client.io.spi_device.memory[:40])
+
+    def test_stream_read_sink(self, emulator_client):
+        emulator_client.stream_window = 1
+        sink = io.BytesIO()
+        assert emulator_client.parallel_stream_read(0, 4096, sink) == 4096
+        assert sink.getvalue() == bytes(emulator_client.io.parallel_device.memory)
+        emulator_client.nop()
+
@@ -0,0 +1,62 @@
+import pytest
+import random
+
+from openeeprom.chip.parallelnor import SST39SF010A, AM29F010
+from openeeprom.client import OpenEEPROMClient, OpenEEPROMCommandFailedException
+from openeeprom.transport.emulator import EmulatorTransport, EmulatedNORFlash
+
+
+@pytest.fixture
+def chip():
+    chip = SST39SF010A()
+    device = EmulatedNORFlash(chip.size, chip.sector_size, chip.unlock_addresses, (0xBF, 0xB5))
+    chip.connect(OpenEEPROMClient(EmulatorTransport(parallel_device=device)))
+    chip.device = device
+    return chip
+
+
+class TestParallelNORFlash:
+    def test_product_id(self, chip):
+        assert chip.read_product_id() == (0xBF, 0xB5)
+        assert chip.read(0, 2) == [0xFF, 0xFF]
+
+    def test_write_read(self, chip):
+        write_vals = [random.randint(0, 255) for i in range(3 * chip.sector_size)]
+        assert chip.write(1000, write_vals) == len(write_vals)
+        assert chip.read(1000, len(write_vals)) == write_vals
+
+    def test_overwrite_preserves_sector(self, chip):
+        chip.write(0, [0x00] * chip.sector_size)
+        chip.write(16, [0xAB] * 16)
+        assert chip.read(0, 48) == [0x00] * 16 + [0xAB] * 16 + [0x00] * 16
+        assert chip.read(chip.sector_size, 16) == [0xFF] * 16
+
+    def test_chunked_read(self, chip):
+        chip.client.streaming = False
+        chip.device.memory[:] = bytes(range(256)) * (chip.size // 256)
+        assert chip.read(100, 1000) == list(chip.device.memory[100:1100])
+
+    def test_write_skips_erase(self, chip):
+        chip.write(0, [0xF0] * 16)
+        chip.erase_sector = None  # clearing bits must not need an erase
+        chip.write(0, [0x30] * 16)
+        assert chip.read(0, 16) == [0x30] * 16
+
+    def test_erase(self, chip):
+        chip.write(0, [0] * 64)
+        chip.erase()
+        assert chip.device.memory == bytearray([0xFF]) * chip.size
+
+    def test_erase_timeout(self, chip):
+        chip.device.erase_polls = 10**9
+        chip.sector_erase_timeout = 0.01
+        with pytest.raises(OpenEEPROMCommandFailedException):
+            chip.erase_sector(0)
+
+    def test_amd_unlock_addresses(self):
+        chip = AM29F010()
+        device = EmulatedNORFlash(chip.size, chip.sector_size, chip.unlock_addresses, (0x01, 0x20))
+        chip.connect(OpenEEPROMClient(EmulatorTransport(parallel_device=device)))
+        assert chip.read_product_id() == (0x01, 0x20)
+        chip.write(chip.size - 4, [1, 2, 3, 4])
+        assert chip.read(chip.size - 4, 4) == [1, 2, 3, 4]
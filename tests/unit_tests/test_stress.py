@@ -0,0 +1,86 @@
+import pytest
+
+from openeeprom import stress
+from openeeprom.chip.at28c256 import AT28C256
+from openeeprom.client import OpenEEPROMClient
+from openeeprom.stress import STRESS_PATTERNS, stress_test, failing_bits
+from openeeprom.transport.emulator import EmulatorTransport, EmulatedParallelMemory
+
+
+class StuckBitMemory(EmulatedParallelMemory):
+    def __init__(self, size: int, address: int, bit: int):
+        super().__init__(size)
+        self.stuck_address = address
+        self.stuck_bit = bit
+
+    def write(self, address: int, value: int) -> None:
+        if address == self.stuck_address:
+            value &= ~(1 << self.stuck_bit)
+        super().write(address, value)
+
+
+def make_chip(device):
+    chip = AT28C256()
+    chip.connect(OpenEEPROMClient(EmulatorTransport(parallel_device=device)))
+    return chip
+
+
+@pytest.fixture(params=['numpy', 'bytes'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(stress, 'np', None)
+    return request.param
+
+
+class TestStress:
+    @pytest.mark.parametrize('pattern', list(STRESS_PATTERNS))
+    def test_good_chip(self, backend, pattern):
+        chip = make_chip(EmulatedParallelMemory(32768))
+        result = stress_test(chip, pattern, 100, 1000, seed=3, chunk_size=256)
+        assert result.passed
+        assert result.bytes_tested == 1000 * len(STRESS_PATTERNS[pattern](3))
+
+    def test_patterns(self, backend):
+        for pattern in ('checkerboard', 'walking-ones', 'address-in-address'):
+            for generate in STRESS_PATTERNS[pattern](0):
+                assert generate(3, 10) + generate(13, 7) == generate(3, 17)
+        generate = STRESS_PATTERNS['random'](1)[0]
+        assert generate(3, 10) == generate(3, 10) != STRESS_PATTERNS['random'](2)[0](3, 10)
+        assert STRESS_PATTERNS['checkerboard'](0)[0](1, 4) == bytes([0xAA, 0x55, 0xAA, 0x55])
+        assert STRESS_PATTERNS['walking-ones'](0)[0](6, 3) == bytes([0x40, 0x80, 0x01])
+        assert STRESS_PATTERNS['walking-ones'](0)[3](6, 3) == bytes([0x02, 0x04, 0x08])
+        assert STRESS_PATTERNS['address-in-address'](0)[0](0x1234, 1) == bytes([0x26])
+
+    def test_stuck_bit(self, backend):
+        chip = make_chip(StuckBitMemory(32768, 0x123, 4))
+        result = stress_test(chip, 'checkerboard', 0, 1024, chunk_size=100)
+        assert result.failure_count == 1
+        assert result.failures == [(0x123, 0x55, 0x45)]
+        assert result.bit_failures == [0, 0, 0, 0, 1, 0, 0, 0]
+        assert failing_bits(0x55, 0x45) == [4]
+
+    def test_walking_ones_stuck_bit(self, backend):
+        chip = make_chip(StuckBitMemory(32768, 0x123, 4))
+        result = stress_test(chip, 'walking-ones', 0, 1024, chunk_size=100)
+        # bit 4 of 0x123 is only set in one of the 8 passes
+        assert result.failure_count == 1
+        assert result.failures == [(0x123, 0x10, 0x00)]
+        assert result.bit_failures == [0, 0, 0, 0, 1, 0, 0, 0]
+
+    def test_address_aliasing(self, backend):
+        # a missing address line makes the upper half of the chip alias the lower half
+        chip = make_chip(EmulatedParallelMemory(256))
+        result = stress_test(chip, 'address-in-address', 0, 512, max_failures=10)
+        assert not result.passed
+        assert result.failure_count == 256
+        assert len(result.failures) == 10
+        assert result.failures[0] == (0, 0x00, 0x01)
+
+    def test_range(self):
+        chip = make_chip(EmulatedParallelMemory(32768))
+        with pytest.raises(ValueError):
+            stress_test(chip, 'random', 32000, 1000)
+        with pytest.raises(ValueError):
+            stress_test(chip, 'marching', 0, 10)